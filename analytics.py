@@ -0,0 +1,397 @@
+# analytics.py - Filtering and aggregation over the canonical savings dataset
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from timing import span
+
+# Sidebar filter values; None means "no filter" for every field
+FilterSpec = namedtuple("FilterSpec", ["start_date", "end_date", "finance_fy", "scp_fy", "domain"])
+
+# Everything the page shows for one filter selection
+FilterResult = namedtuple("FilterResult", ["rows", "summary", "series"])
+
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("SCP_RESULT_CACHE_ENTRIES", "256"))
+RESULT_CACHE_MAX_BYTES = int(float(os.environ.get("SCP_RESULT_CACHE_MB", "64")) * 1024 * 1024)
+
+MEASURES = ["Savings_Finance", "Savings_SCP"]
+
+DIMENSION_FILTERS = {
+    "finance_fy": "FY of Savings-Finance",
+    "scp_fy": "FY of Savings-SCP",
+    "domain": "Domain",
+}
+
+
+class FilterIndex:
+    """Precomputed row bitmaps and sorted date positions for the dashboard filters
+
+    Built once per dataset version. Each dimension value maps to a packed
+    row bitmap, and each date column keeps its non-missing row positions
+    sorted by date. A selection is then a bitwise AND of bitmaps plus
+    ``searchsorted`` ranges, and the frame is gathered once at the end.
+    """
+
+    def __init__(self, df):
+        self.row_count = len(df)
+        self._all = np.packbits(np.ones(self.row_count, dtype=bool))
+
+        self.bitmaps = {}
+        for column in DIMENSION_FILTERS.values():
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+            self.bitmaps[column] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(uniques.tolist())
+            }
+
+        self.date_positions = {}
+        for column in ("Contract Start", "Contract End"):
+            if column not in df.columns:
+                continue
+            values = df[column].to_numpy()
+            present = np.flatnonzero(~pd.isna(values))
+            order = present[np.argsort(values[present], kind="stable")]
+            self.date_positions[column] = (values[order], order)
+
+    def _value_bitmap(self, column, value):
+        bitmaps = self.bitmaps.get(column)
+        if bitmaps is None:
+            return None
+        bitmap = bitmaps.get(value)
+        if bitmap is None:
+            return np.zeros_like(self._all)
+        return bitmap
+
+    def _date_bitmap(self, column, bound, side):
+        sorted_values, order = self.date_positions[column]
+        bound = pd.Timestamp(bound).to_datetime64().astype(sorted_values.dtype)
+        if side == "start":
+            # Contract Start >= bound
+            positions = order[np.searchsorted(sorted_values, bound, side="left"):]
+        else:
+            # Contract End <= bound
+            positions = order[:np.searchsorted(sorted_values, bound, side="right")]
+        mask = np.zeros(self.row_count, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def select(self, spec):
+        """Row positions (ascending) matching a ``FilterSpec``"""
+        selected = self._all.copy()
+        if spec.start_date and "Contract Start" in self.date_positions:
+            selected &= self._date_bitmap("Contract Start", spec.start_date, "start")
+        if spec.end_date and "Contract End" in self.date_positions:
+            selected &= self._date_bitmap("Contract End", spec.end_date, "end")
+        for field, column in DIMENSION_FILTERS.items():
+            value = getattr(spec, field)
+            if value is None:
+                continue
+            bitmap = self._value_bitmap(column, value)
+            if bitmap is not None:
+                selected &= bitmap
+        mask = np.unpackbits(selected, count=self.row_count).astype(bool)
+        return np.flatnonzero(mask)
+
+
+def apply_filters(dataset, spec):
+    """The filtered frame for ``spec``; the full frame itself when nothing is filtered"""
+    return filtered_frame(dataset, dataset.filter_index.select(spec))
+
+
+def filtered_frame(dataset, rows):
+    """Gather the selected rows; the full frame itself when every row is selected"""
+    if len(rows) == dataset.row_count:
+        return dataset.df
+    return dataset.df.take(rows)
+
+
+def measure_arrays(df):
+    """Contiguous inputs of the KPI kernel
+
+    Returns a (2, n) float64 matrix of Savings_Finance / Savings_SCP, the
+    factorized Domain codes (-1 for missing) and the number of domains.
+    """
+    measures = np.ascontiguousarray(
+        np.vstack([df[column].to_numpy(dtype=np.float64) for column in MEASURES])
+    )
+    if "Domain" not in df.columns:
+        return measures, None, 0
+    codes, uniques = pd.factorize(df["Domain"])
+    return measures, codes.astype(np.min_scalar_type(-len(uniques) - 1)), len(uniques)
+
+
+def kpi_kernel(measures, domain_codes=None, domain_count=0, rows=None):
+    """Net, upside, exposure, count, mean and distinct-domain count in one sweep
+
+    Works on both measures at once over the contiguous (2, n) matrix, with
+    no per-KPI boolean masks or intermediate Series. ``rows`` restricts it
+    to a selection; None means every row.
+    """
+    if rows is not None and len(rows) == measures.shape[1]:
+        rows = None
+    values = measures if rows is None else measures.take(rows, axis=1)
+    count = values.shape[1]
+
+    net = values.sum(axis=1)
+    buffer = np.maximum(values, 0.0)
+    gains = buffer.sum(axis=1)
+    # v - max(v, 0) == min(v, 0) exactly, so no second comparison pass;
+    # reuse the same buffer instead of allocating another temporary
+    np.subtract(values, buffer, out=buffer)
+    risks = buffer.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = net / count
+
+    domains = None
+    if domain_codes is not None:
+        codes = domain_codes if rows is None else domain_codes.take(rows)
+        # Missing domains are coded -1 and land in the spare last slot
+        seen = np.zeros(domain_count + 1, dtype=bool)
+        seen[codes] = True
+        domains = int(np.count_nonzero(seen[:domain_count]))
+
+    return {
+        "total_finance": net[0],
+        "gains_finance": gains[0],
+        "risks_finance": risks[0],
+        "total_scp": net[1],
+        "gains_scp": gains[1],
+        "risks_scp": risks[1],
+        "count": count,
+        "avg_finance": mean[0],
+        "avg_scp": mean[1],
+        "domains": domains,
+    }
+
+
+def summarize(df):
+    """Executive Summary and Portfolio Overview numbers for a filtered frame"""
+    return kpi_kernel(*measure_arrays(df))
+
+
+def chart_series(df):
+    """Grouped series behind the three charts; a chart's entry is None when its column is missing"""
+    series = {"finance_by_fy": None, "scp_by_fy": None, "finance_by_domain": None}
+    if "FY of Savings-Finance" in df.columns:
+        data = df.groupby("FY of Savings-Finance", observed=True)["Savings_Finance"].sum().reset_index()
+        series["finance_by_fy"] = data.sort_values("FY of Savings-Finance")
+    if "FY of Savings-SCP" in df.columns:
+        data = df.groupby("FY of Savings-SCP", observed=True)["Savings_SCP"].sum().reset_index()
+        series["scp_by_fy"] = data.sort_values("FY of Savings-SCP")
+    if "Domain" in df.columns:
+        data = df.groupby("Domain", observed=True)["Savings_Finance"].sum().reset_index()
+        series["finance_by_domain"] = data.sort_values("Savings_Finance", ascending=True)
+    return series
+
+
+class SavingsCube:
+    """Materialised aggregates over Domain x Finance FY x SCP FY
+
+    Holds, per cell and for both measures, the sum, positive sum and
+    negative sum, plus the row count. Every cell axis has a spare last slot
+    for rows whose dimension value is missing. The cube covers one contract
+    date window (the dashboard's default one), so any Finance FY / SCP FY /
+    Domain selection inside that window is answered by slicing. Other date
+    ranges fall back to a row scan.
+    """
+
+    AXES = ["Domain", "FY of Savings-Finance", "FY of Savings-SCP"]
+
+    def __init__(self, df, filter_index, window=(None, None)):
+        self.window = window
+        rows = filter_index.select(FilterSpec(window[0], window[1], None, None, None))
+
+        self.labels = []
+        codes = []
+        for column in self.AXES:
+            if column in df.columns:
+                column_codes, uniques = pd.factorize(df[column], sort=True)
+                labels = uniques.tolist()
+            else:
+                column_codes, labels = np.full(len(df), -1, dtype=np.intp), []
+            # Missing values (-1) go to the spare last slot
+            column_codes = np.where(column_codes < 0, len(labels), column_codes).take(rows)
+            self.labels.append(labels)
+            codes.append(column_codes)
+
+        shape = tuple(len(labels) + 1 for labels in self.labels)
+        cells = np.ravel_multi_index(codes, shape) if len(rows) else np.zeros(0, dtype=np.intp)
+        size = int(np.prod(shape))
+
+        values = np.vstack([df[column].to_numpy(dtype=np.float64).take(rows) for column in MEASURES])
+        self.count = np.bincount(cells, minlength=size).reshape(shape)
+        self.sums = np.stack([np.bincount(cells, weights=v, minlength=size).reshape(shape) for v in values])
+        self.gains = np.stack([np.bincount(cells, weights=np.maximum(v, 0.0), minlength=size).reshape(shape) for v in values])
+        self.risks = np.stack([np.bincount(cells, weights=np.minimum(v, 0.0), minlength=size).reshape(shape) for v in values])
+        self.columns = set(df.columns)
+
+    def covers(self, spec):
+        """True when ``spec`` can be answered from the cube"""
+        return (spec.start_date or None, spec.end_date or None) == self.window
+
+    def _axis_selector(self, axis, value):
+        if value is None or self.AXES[axis] not in self.columns:
+            return slice(None)
+        try:
+            return [self.labels[axis].index(value)]
+        except ValueError:
+            # Unknown value: select nothing
+            return []
+
+    def answer(self, spec):
+        """``(summary, series)`` for ``spec``, in the same shape as the row-scan path"""
+        selector = tuple(
+            self._axis_selector(axis, getattr(spec, field))
+            for axis, field in enumerate(["domain", "finance_fy", "scp_fy"])
+        )
+        index = np.ix_(*[np.arange(n)[s] for s, n in zip(selector, self.count.shape)])
+        count = self.count[index]
+        sums = self.sums[(slice(None),) + index]
+        gains = self.gains[(slice(None),) + index]
+        risks = self.risks[(slice(None),) + index]
+
+        total = int(count.sum())
+        net = sums.sum(axis=(1, 2, 3))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = net / total
+
+        domains = None
+        if "Domain" in self.columns:
+            # Domain axis positions that have rows, excluding the missing-value slot
+            domain_positions = np.arange(self.count.shape[0])[selector[0]]
+            present = count.sum(axis=(1, 2)) > 0
+            domains = int(np.count_nonzero(present & (domain_positions < len(self.labels[0]))))
+
+        summary = {
+            "total_finance": net[0],
+            "gains_finance": gains[0].sum(),
+            "risks_finance": risks[0].sum(),
+            "total_scp": net[1],
+            "gains_scp": gains[1].sum(),
+            "risks_scp": risks[1].sum(),
+            "count": total,
+            "avg_finance": mean[0],
+            "avg_scp": mean[1],
+            "domains": domains,
+        }
+
+        series = {"finance_by_fy": None, "scp_by_fy": None, "finance_by_domain": None}
+        for key, axis, measure in (("finance_by_fy", 1, 0), ("scp_by_fy", 2, 1), ("finance_by_domain", 0, 0)):
+            column = self.AXES[axis]
+            if column not in self.columns:
+                continue
+            other_axes = tuple(a for a in range(3) if a != axis)
+            positions = np.arange(self.count.shape[axis])[selector[axis]]
+            group_counts = count.sum(axis=other_axes)
+            group_sums = sums[measure].sum(axis=other_axes)
+            # Like groupby(observed=True): only labelled groups that have rows
+            keep = (group_counts > 0) & (positions < len(self.labels[axis]))
+            data = pd.DataFrame({
+                column: [self.labels[axis][p] for p in positions[keep]],
+                MEASURES[measure]: group_sums[keep],
+            })
+            if key == "finance_by_domain":
+                data = data.sort_values(MEASURES[measure], ascending=True)
+            series[key] = data
+        return summary, series
+
+
+def _result_bytes(result):
+    size = result.rows.nbytes
+    for data in result.series.values():
+        if data is not None:
+            size += int(data.memory_usage(deep=True).sum())
+    return size + 1024
+
+
+class ResultCache:
+    """Process-wide LRU of ``FilterResult`` keyed by (dataset version, FilterSpec)
+
+    Bounded by entry count and by an estimate of the bytes held (row
+    indices plus grouped series). Keeps hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = _result_bytes(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+            }
+
+
+result_cache = ResultCache()
+
+
+def query(dataset, spec):
+    """``FilterResult`` for ``spec``, memoised across sessions per dataset version"""
+    key = (dataset.version, spec)
+    result = result_cache.get(key)
+    if result is None:
+        if dataset.engine is not None:
+            # An optional engine (SCP_QUERY_ENGINE) answers filter and aggregates itself
+            rows, summary, series = dataset.engine.query(spec)
+        else:
+            with span("filter", rows=dataset.row_count):
+                rows = dataset.filter_index.select(spec)
+            with span("aggregate", rows=len(rows)):
+                if dataset.cube is not None and dataset.cube.covers(spec):
+                    summary, series = dataset.cube.answer(spec)
+                else:
+                    # A custom date range: scan the selected rows
+                    df = filtered_frame(dataset, rows)
+                    summary = kpi_kernel(dataset.measures, dataset.domain_codes, dataset.domain_count, rows)
+                    series = chart_series(df)
+        rows.flags.writeable = False
+        result = FilterResult(rows, summary, series)
+        result_cache.put(key, result)
+    return result
@@ -2,12 +2,20 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, date
-import numpy as np
-import requests
-from io import BytesIO
+from functools import partial, wraps
+
+from onedrive import fetch_from_onedrive
+from snapshot_cache import content_hash, load_or_parse
+from refresher import BackgroundRefresher, format_age
+from transport import breaker
+from workbook import SCHEMA_VERSION, read_savings_workbook
+from dataset import build_dataset, format_bytes
+from analytics import FilterSpec, query, result_cache
+from charts import cached_domain_figure, cached_fiscal_year_figure, figure_cache
+from exports import EXPORT_FORMATS, available_formats, export_cache, export_size, portfolio_export, summary_csv
+from lake import LAKE_DIR, SavingsLake, lake_signature
+from timing import TIMING_HISTORY, current_trace, finish_trace, section_trace, span, stage_stats, start_trace
 
 # Configure Streamlit page
 st.set_page_config(
@@ -17,6 +25,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Stage timings of this full run; fragment-only reruns start their own trace
+run_trace = start_trace()
+
 # Executive-style CSS with improved 3-column horizontal layout
 st.markdown("""
 <style>
@@ -142,105 +153,96 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Robust OneDrive file configuration
-def convert_onedrive_to_direct_download(onedrive_url):
-    """Convert OneDrive sharing URL to direct download URL"""
-    try:
-        if "onedrive.live.com" in onedrive_url:
-            # For onedrive.live.com URLs, we need to modify the URL structure
-            if "redir?resid=" in onedrive_url:
-                # Handle redirect-style URLs
-                return onedrive_url.replace("redir?resid=", "download?resid=")
-            elif "?e=" in onedrive_url:
-                # Add download parameter to existing URL
-                return onedrive_url.replace("?e=", "?download=1&e=")
-            else:
-                # Add download parameter
-                separator = "&" if "?" in onedrive_url else "?"
-                return f"{onedrive_url}{separator}download=1"
-        elif "1drv.ms" in onedrive_url:
-            separator = "&" if "?" in onedrive_url else "?"
-            return f"{onedrive_url}{separator}download=1"
-        return onedrive_url
-    except:
-        return onedrive_url
+def parse_savings_workbook(content, sha256=None):
+    """Load a workbook from its Parquet snapshot, parsing the XLSX only on a miss
+
+    The frame's ``attrs["source"]`` records the snapshot key, so an
+    unchanged workbook can be recognised without hashing the frame.
+    """
+    key = f"{sha256 or content_hash(content)}-v{SCHEMA_VERSION}"
+    df = load_or_parse(content, read_savings_workbook, key=key)
+    if df is not None:
+        df.attrs["source"] = key
+    return df
+
+def load_dataset(onedrive_url, current=None):
+    """Load the workbook and canonicalise it into a shared, read-only SavingsDataset
+
+    ``current`` is handed back as is when it was built from the same
+    workbook, so an unchanged poll does not rebuild the indexes and engine.
+    """
+    df, message, is_fallback = load_data_from_onedrive(onedrive_url)
+    if df is not None and current is not None and current.source is not None and current.source == df.attrs.get("source"):
+        return current, message, is_fallback
+    return build_dataset(df), message, is_fallback
 
 # Enhanced OneDrive data loading with multiple methods
-@st.cache_data
 def load_data_from_onedrive(onedrive_url):
-    """Load Excel data from OneDrive with comprehensive error handling"""
+    """Load Excel data from OneDrive with comprehensive error handling
+
+    Returns ``(df, message, is_fallback)``; ``is_fallback`` is True when the
+    data did not come from OneDrive (the local backup file, or nothing).
+    """
     
-    # First, try to get OneDrive API direct download link
-    try:
-        # Extract resource ID from OneDrive URL for API call
-        if "resid=" in onedrive_url:
-            # Try direct API approach
-            import re
-            resid_match = re.search(r'resid=([^&]+)', onedrive_url)
-            if resid_match:
-                resource_id = resid_match.group(1)
-                api_url = f"https://api.onedrive.com/v1.0/shares/{resource_id}/root/content"
-                
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet,*/*'
-                }
-                
-                response = requests.get(api_url, headers=headers, timeout=30, allow_redirects=True)
-                if response.status_code == 200 and len(response.content) > 1000:
-                    df = pd.read_excel(BytesIO(response.content), sheet_name="Savings_WIP_Data")
-                    if len(df) > 0:
-                        return df, "OneDrive file loaded successfully via API"
-    except:
-        pass
-    
-    # Method 2: Try direct download conversion
-    try:
-        direct_url = convert_onedrive_to_direct_download(onedrive_url)
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet,*/*',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
-        
-        response = requests.get(direct_url, headers=headers, timeout=30, allow_redirects=True)
-        if response.status_code == 200 and len(response.content) > 1000:
-            df = pd.read_excel(BytesIO(response.content), sheet_name="Savings_WIP_Data")
-            if len(df) > 0:
-                return df, "OneDrive file loaded successfully"
-    except Exception as e:
-        st.warning(f"OneDrive direct method failed: {str(e)}")
-    
-    # Method 3: Try with different URL modifications
-    try:
-        # Try removing specific parameters that might interfere
-        clean_url = onedrive_url.split('&redeem=')[0] if '&redeem=' in onedrive_url else onedrive_url
-        clean_url = clean_url.split('&migratedtospo=')[0] if '&migratedtospo=' in clean_url else clean_url
-        
-        if clean_url != onedrive_url:
-            response = requests.get(clean_url, headers=headers, timeout=30, allow_redirects=True)
-            if response.status_code == 200 and len(response.content) > 1000:
-                df = pd.read_excel(BytesIO(response.content), sheet_name="Savings_WIP_Data")
-                if len(df) > 0:
-                    return df, "OneDrive file loaded with cleaned URL"
-    except:
-        pass
+    df, message = fetch_from_onedrive(onedrive_url, parse_savings_workbook)
+    if df is not None:
+        return df, message, False
     
     # Fallback: Use local file
     try:
-        df = pd.read_excel("SCP_Savings_FY26_dummy_v3.xlsx", sheet_name="Savings_WIP_Data")
-        return df, "Using local file - OneDrive connection failed. Please check URL permissions and format."
+        with open("SCP_Savings_FY26_dummy_v3.xlsx", "rb") as f:
+            df = parse_savings_workbook(f)
+        return df, "Using local file - OneDrive connection failed. Please check URL permissions and format.", True
     except FileNotFoundError:
-        return None, "OneDrive connection failed and no local backup file found. Please verify the OneDrive URL is accessible."
+        return None, "OneDrive connection failed and no local backup file found. Please verify the OneDrive URL is accessible.", True
     except Exception as e:
-        return None, f"Failed to load data from any source: {str(e)}"
+        return None, f"Failed to load data from any source: {str(e)}", True
+
+@st.cache_resource(max_entries=4, on_release=BackgroundRefresher.stop)
+def get_refresher(onedrive_url):
+    """Process-wide stale-while-revalidate refresher for one OneDrive URL"""
+    # load runs on the refresher's own thread, the only writer of refresher.df
+    refresher = BackgroundRefresher(lambda: load_dataset(onedrive_url, refresher.df))
+    return refresher
+
+@st.cache_resource(max_entries=4)
+def get_lake(lake_dir, signature):
+    """Process-wide handle on the Parquet lake; an ingest changes the signature and reopens it"""
+    return SavingsLake(lake_dir, signature)
+
+def show_performance(trace):
+    """Fill the sidebar ⏱ Performance panel with ``trace`` and the rolling per-stage stats"""
+    with performance_panel.container():
+        with st.expander("⏱ Performance"):
+            st.caption(f"Last rerun: {trace.elapsed() * 1000:,.0f} ms")
+            st.dataframe(pd.DataFrame(trace.table()).convert_dtypes(), hide_index=True)
+            st.caption(f"Rolling per stage (last {TIMING_HISTORY} spans, all sessions)")
+            st.dataframe(pd.DataFrame(stage_stats.snapshot()).convert_dtypes(), hide_index=True)
+
+def traced_section(section):
+    """Time a fragment as one stage of this run's trace, or of its own on a fragment-only rerun"""
+    @wraps(section)
+    def run():
+        with section_trace(), span(section.__name__):
+            section()
+    return run
 
 # Dashboard Header
 st.markdown('<h1 class="main-header">Executive SCP Savings Dashboard</h1>', unsafe_allow_html=True)
 
-# OneDrive Configuration Section
-with st.sidebar:
+# The page is split into fragments so a widget only reruns the section it
+# belongs to. Sections hand state to each other through st.session_state:
+#   onedrive_url  - URL typed in the sidebar (the data source of the app run)
+#   dataset       - canonical SavingsDataset of the last app run (of the
+#                   current filter selection when reading the Parquet lake)
+#   lake          - SavingsLake when SCP_LAKE_DIR is set, else None
+#   filter_spec   - current filter selection
+#   filter_result - rows, KPIs and chart series for filter_spec
+
+@st.fragment
+@traced_section
+def onedrive_config():
+    """URL and Reload/Test controls; Test only reruns this fragment"""
     st.markdown('<div class="onedrive-config">', unsafe_allow_html=True)
     st.header("🔗 OneDrive Configuration")
     
@@ -256,7 +258,8 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🔄 Reload"):
-            st.cache_data.clear()
+            breaker.reset()
+            get_refresher(onedrive_url).refresh_now()
             st.rerun()
     
     with col2:
@@ -265,6 +268,16 @@ with st.sidebar:
     
     st.markdown('</div>', unsafe_allow_html=True)
     
+    # A new URL changes the data every section is built from, so it needs a full run
+    previous_url = st.session_state.get("onedrive_url", onedrive_url)
+    st.session_state["onedrive_url"] = onedrive_url
+    if onedrive_url != previous_url:
+        st.rerun()
+
+# OneDrive Configuration Section
+with st.sidebar:
+    onedrive_config()
+    
     # Data source info
     st.info("📊 OneDrive Integration Active")
     st.markdown("**Features:**")
@@ -273,411 +286,393 @@ with st.sidebar:
     st.markdown("• Advanced Filtering")
     st.markdown("• Export Capabilities")
 
+onedrive_url = st.session_state["onedrive_url"]
+
 # Load data with progress indicator
-with st.spinner("Connecting to OneDrive..."):
-    df, load_message = load_data_from_onedrive(onedrive_url)
+# Only the first load of the process waits; afterwards the last good
+# snapshot is served while the refresher re-polls OneDrive in the background
+if LAKE_DIR:
+    # Multi-year history from the Parquet lake (lake.py); only the footers are
+    # read here, the dashboard reads the partitions its filters touch
+    refresher = None
+    with span("data load"):
+        lake = get_lake(LAKE_DIR, lake_signature(LAKE_DIR))
+    dataset, load_is_fallback = None, False
+    if lake.row_count:
+        load_message = f"Parquet lake loaded successfully: {lake.describe()}"
+    else:
+        load_message = f"The Parquet lake {LAKE_DIR} is empty. Ingest workbooks with `python lake.py --lake {LAKE_DIR} WORKBOOK`."
+else:
+    lake = None
+    refresher = get_refresher(onedrive_url)
+    with st.spinner("Connecting to OneDrive..."):
+        with span("data load") as loaded:
+            dataset, load_message, load_is_fallback = refresher.current()
+            loaded.rows = dataset.row_count if dataset is not None else None
+# The canonical frame is shared by every session - never modify it in place
+df = dataset.df if dataset is not None else None
+has_data = df is not None or (lake is not None and lake.row_count > 0)
+st.session_state["dataset"] = dataset
+st.session_state["lake"] = lake
+
+with st.sidebar:
+    st.markdown("**Data Snapshot:**")
+    if refresher is not None:
+        st.caption(f"Age: {format_age(refresher.age_seconds())} · Refresh every {format_age(refresher.interval)}")
+        st.caption(f"Status: {refresher.status()}")
+    else:
+        st.caption(f"Parquet lake: {lake.describe()}")
+    if dataset is not None:
+        st.caption(f"Memory: {format_bytes(dataset.memory_before)} → {format_bytes(dataset.memory_after)} ({dataset.row_count:,} rows)")
+    
+    with st.expander("📡 Download Strategies"):
+        strategy_stats = breaker.snapshot()
+        if strategy_stats:
+            st.dataframe(pd.DataFrame(strategy_stats), hide_index=True)
+        else:
+            st.caption("No download attempts yet")
+    
+    # Filled by the dashboard fragment, so it is refreshed on filter-only reruns too
+    cache_diagnostics = st.empty()
+    performance_panel = st.empty()
 
 # Display load status with appropriate styling
-if df is not None:
-    if "successfully" in load_message.lower():
+if has_data:
+    if not load_is_fallback:
         st.success(load_message)
     else:
         st.warning(load_message)
 else:
     st.error(load_message)
 
-if df is not None:
-    # Data preprocessing
-    df.rename(columns={
-        "Difference (PA)-Finance": "Savings_Finance",
-        "Difference (PA) -SCP": "Savings_SCP",
-    }, inplace=True)
-    
-    # Ensure numeric columns
-    df["Savings_Finance"] = pd.to_numeric(df["Savings_Finance"], errors="coerce").fillna(0)
-    df["Savings_SCP"] = pd.to_numeric(df["Savings_SCP"], errors="coerce").fillna(0)
-    
-    # Convert date columns
-    date_columns = ["Contract Start", "Contract End"]
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-
-    # FILTERS SECTION
-    st.markdown('<div class="filter-section">', unsafe_allow_html=True)
-    st.markdown('<h3 class="section-header">📊 Business Intelligence Filters</h3>', unsafe_allow_html=True)
-    
-    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
-    
-    with filter_col1:
-        if "Contract Start" in df.columns:
-            min_start_date = df["Contract Start"].min()
-            max_start_date = df["Contract Start"].max()
-            if pd.notna(min_start_date) and pd.notna(max_start_date):
-                start_date_filter = st.date_input(
-                    "Contract Start Date",
-                    value=min_start_date.date(),
-                    min_value=min_start_date.date(),
-                    max_value=max_start_date.date()
-                )
-            else:
-                start_date_filter = None
-        else:
-            start_date_filter = None
-
-    with filter_col2:
-        if "Contract End" in df.columns:
-            min_end_date = df["Contract End"].min()
-            max_end_date = df["Contract End"].max()
-            if pd.notna(min_end_date) and pd.notna(max_end_date):
-                end_date_filter = st.date_input(
-                    "Contract End Date",
-                    value=max_end_date.date(),
-                    min_value=min_end_date.date(),
-                    max_value=max_end_date.date()
-                )
-            else:
-                end_date_filter = None
-        else:
-            end_date_filter = None
-
-    with filter_col3:
-        if "FY of Savings-Finance" in df.columns:
-            finance_fy_options = ["All"] + sorted(df["FY of Savings-Finance"].dropna().unique().tolist())
-            finance_fy_filter = st.selectbox(
-                "Finance FY",
-                options=finance_fy_options,
-                index=0
-            )
-        else:
-            finance_fy_filter = "All"
-
-    with filter_col4:
-        if "FY of Savings-SCP" in df.columns:
-            scp_fy_options = ["All"] + sorted(df["FY of Savings-SCP"].dropna().unique().tolist())
-            scp_fy_filter = st.selectbox(
-                "SCP FY",
-                options=scp_fy_options,
-                index=0
-            )
-        else:
-            scp_fy_filter = "All"
-
-    # Domain filter
-    if "Domain" in df.columns:
-        domain_options = ["All Domains"] + sorted(df["Domain"].dropna().unique().tolist())
-        domain_filter = st.selectbox(
-            "🏢 Business Domain",
-            options=domain_options,
-            index=0
-        )
-    else:
-        domain_filter = "All Domains"
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    # Apply filters
-    filtered_df = df.copy()
-    
-    if start_date_filter and "Contract Start" in df.columns:
-        filtered_df = filtered_df[filtered_df["Contract Start"] >= pd.Timestamp(start_date_filter)]
-    
-    if end_date_filter and "Contract End" in df.columns:
-        filtered_df = filtered_df[filtered_df["Contract End"] <= pd.Timestamp(end_date_filter)]
-    
-    if finance_fy_filter != "All":
-        filtered_df = filtered_df[filtered_df["FY of Savings-Finance"] == finance_fy_filter]
-    
-    if scp_fy_filter != "All":
-        filtered_df = filtered_df[filtered_df["FY of Savings-SCP"] == scp_fy_filter]
-    
-    if domain_filter != "All Domains":
-        filtered_df = filtered_df[filtered_df["Domain"] == domain_filter]
-
-    # Calculate insights
-    total_finance_savings = filtered_df["Savings_Finance"].sum()
-    gains_finance = filtered_df.loc[filtered_df["Savings_Finance"] > 0, "Savings_Finance"].sum()
-    risks_finance = filtered_df.loc[filtered_df["Savings_Finance"] < 0, "Savings_Finance"].sum()
-    
-    total_scp_savings = filtered_df["Savings_SCP"].sum()
-    gains_scp = filtered_df.loc[filtered_df["Savings_SCP"] > 0, "Savings_SCP"].sum()
-    risks_scp = filtered_df.loc[filtered_df["Savings_SCP"] < 0, "Savings_SCP"].sum()
+def insight_tile(title, value, subtitle, kind=""):
+    st.markdown(f"""
+        <div class="insight-tile {kind}">
+            <div class="tile-title">{title}</div>
+            <div class="tile-value">${value:,.0f}</div>
+            <div class="tile-subtitle">{subtitle}</div>
+        </div>
+        """, unsafe_allow_html=True)
 
-    # EXECUTIVE SUMMARY - NEW 3-COLUMN HORIZONTAL LAYOUT
+def executive_summary(summary):
+    """The two 3-column rows of Finance and SCP insight tiles"""
     st.markdown('<div class="executive-summary-section">', unsafe_allow_html=True)
     st.markdown('<h2 class="section-header">📈 Executive Summary</h2>', unsafe_allow_html=True)
     
     # Finance Row
     st.markdown('<div class="summary-row">', unsafe_allow_html=True)
     col1, col2, col3 = st.columns(3)
-    
     with col1:
-        st.markdown(f"""
-        <div class="insight-tile">
-            <div class="tile-title">Net Finance Impact</div>
-            <div class="tile-value">${total_finance_savings:,.0f}</div>
-            <div class="tile-subtitle">Total Portfolio</div>
-        </div>
-        """, unsafe_allow_html=True)
-
+        insight_tile("Net Finance Impact", summary["total_finance"], "Total Portfolio")
     with col2:
-        st.markdown(f"""
-        <div class="insight-tile gains">
-            <div class="tile-title">Finance Upside</div>
-            <div class="tile-value">${gains_finance:,.0f}</div>
-            <div class="tile-subtitle">Value Creation</div>
-        </div>
-        """, unsafe_allow_html=True)
-
+        insight_tile("Finance Upside", summary["gains_finance"], "Value Creation", "gains")
     with col3:
-        st.markdown(f"""
-        <div class="insight-tile risks">
-            <div class="tile-title">Finance Exposure</div>
-            <div class="tile-value">${abs(risks_finance):,.0f}</div>
-            <div class="tile-subtitle">Risk Management</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
+        insight_tile("Finance Exposure", abs(summary["risks_finance"]), "Risk Management", "risks")
     st.markdown('</div>', unsafe_allow_html=True)
     
     # SCP Row
     st.markdown('<div class="summary-row">', unsafe_allow_html=True)
     col1, col2, col3 = st.columns(3)
-    
     with col1:
-        st.markdown(f"""
-        <div class="insight-tile">
-            <div class="tile-title">Net SCP Impact</div>
-            <div class="tile-value">${total_scp_savings:,.0f}</div>
-            <div class="tile-subtitle">Total Portfolio</div>
-        </div>
-        """, unsafe_allow_html=True)
-
+        insight_tile("Net SCP Impact", summary["total_scp"], "Total Portfolio")
     with col2:
-        st.markdown(f"""
-        <div class="insight-tile gains">
-            <div class="tile-title">SCP Upside</div>
-            <div class="tile-value">${gains_scp:,.0f}</div>
-            <div class="tile-subtitle">Value Creation</div>
-        </div>
-        """, unsafe_allow_html=True)
-
+        insight_tile("SCP Upside", summary["gains_scp"], "Value Creation", "gains")
     with col3:
-        st.markdown(f"""
-        <div class="insight-tile risks">
-            <div class="tile-title">SCP Exposure</div>
-            <div class="tile-value">${abs(risks_scp):,.0f}</div>
-            <div class="tile-subtitle">Risk Management</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
+        insight_tile("SCP Exposure", abs(summary["risks_scp"]), "Risk Management", "risks")
     st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
-    # STRATEGIC ANALYTICS SECTION
+@st.fragment
+@traced_section
+def strategic_charts():
+    """Finance and SCP impact per fiscal year"""
+    filter_result = st.session_state["filter_result"]
+    
     st.markdown('<h2 class="section-header">📊 Strategic Analytics</h2>', unsafe_allow_html=True)
 
-    mckinsey_blues = ['#001f3f', '#003366', '#004080', '#0066cc', '#3399ff', '#66b3ff', '#99ccff']
-    
     chart_col1, chart_col2 = st.columns(2)
     
     with chart_col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         
-        if "FY of Savings-Finance" in filtered_df.columns:
-            finance_fy_data = filtered_df.groupby("FY of Savings-Finance")["Savings_Finance"].sum().reset_index()
-            finance_fy_data = finance_fy_data.sort_values("FY of Savings-Finance")
-            
-            n_bars = len(finance_fy_data)
-            colors = [mckinsey_blues[i % len(mckinsey_blues)] for i in range(n_bars)]
-            
-            fig_finance = go.Figure()
-            
-            for i, row in finance_fy_data.iterrows():
-                fig_finance.add_trace(go.Bar(
-                    x=[row["FY of Savings-Finance"]],
-                    y=[row["Savings_Finance"]],
-                    name=row["FY of Savings-Finance"],
-                    marker_color=colors[i],
-                    text=f"${row['Savings_Finance']:,.0f}",
-                    textposition="outside",
-                    showlegend=False,
-                    hovertemplate=f"<b>FY:</b> {row['FY of Savings-Finance']}<br><b>Impact:</b> ${row['Savings_Finance']:,.0f}<extra></extra>"
-                ))
-            
-            fig_finance.update_layout(
-                title={
-                    'text': "Finance Impact by Fiscal Year",
-                    'x': 0.5,
-                    'font': {'size': 18, 'color': '#003366', 'family': 'Helvetica Neue'}
-                },
-                xaxis_title="Fiscal Year",
-                yaxis_title="Financial Impact ($)",
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                font=dict(size=11, color="#003366"),
-                height=450,
-                xaxis=dict(showgrid=False, tickangle=0),
-                yaxis=dict(showgrid=True, gridcolor='#f0f0f0', gridwidth=1)
+        finance_fy_data = filter_result.series["finance_by_fy"]
+        if finance_fy_data is not None:
+            fig_finance = cached_fiscal_year_figure(
+                finance_fy_data, "FY of Savings-Finance", "Savings_Finance",
+                "Finance Impact by Fiscal Year", "Financial Impact ($)"
             )
-            
-            st.plotly_chart(fig_finance, use_container_width=True)
+            with span("chart render"):
+                st.plotly_chart(fig_finance, width="stretch")
         
         st.markdown('</div>', unsafe_allow_html=True)
     
     with chart_col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         
-        if "FY of Savings-SCP" in filtered_df.columns:
-            scp_fy_data = filtered_df.groupby("FY of Savings-SCP")["Savings_SCP"].sum().reset_index()
-            scp_fy_data = scp_fy_data.sort_values("FY of Savings-SCP")
-            
-            n_bars = len(scp_fy_data)
-            colors = [mckinsey_blues[i % len(mckinsey_blues)] for i in range(n_bars)]
-            
-            fig_scp = go.Figure()
-            
-            for i, row in scp_fy_data.iterrows():
-                fig_scp.add_trace(go.Bar(
-                    x=[row["FY of Savings-SCP"]],
-                    y=[row["Savings_SCP"]],
-                    name=row["FY of Savings-SCP"],
-                    marker_color=colors[i],
-                    text=f"${row['Savings_SCP']:,.0f}",
-                    textposition="outside",
-                    showlegend=False,
-                    hovertemplate=f"<b>FY:</b> {row['FY of Savings-SCP']}<br><b>Impact:</b> ${row['Savings_SCP']:,.0f}<extra></extra>"
-                ))
-            
-            fig_scp.update_layout(
-                title={
-                    'text': "SCP Impact by Fiscal Year",
-                    'x': 0.5,
-                    'font': {'size': 18, 'color': '#003366', 'family': 'Helvetica Neue'}
-                },
-                xaxis_title="Fiscal Year",
-                yaxis_title="SCP Impact ($)",
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                font=dict(size=11, color="#003366"),
-                height=450,
-                xaxis=dict(showgrid=False, tickangle=0),
-                yaxis=dict(showgrid=True, gridcolor='#f0f0f0', gridwidth=1)
+        scp_fy_data = filter_result.series["scp_by_fy"]
+        if scp_fy_data is not None:
+            fig_scp = cached_fiscal_year_figure(
+                scp_fy_data, "FY of Savings-SCP", "Savings_SCP",
+                "SCP Impact by Fiscal Year", "SCP Impact ($)"
             )
-            
-            st.plotly_chart(fig_scp, use_container_width=True)
+            with span("chart render"):
+                st.plotly_chart(fig_scp, width="stretch")
         
         st.markdown('</div>', unsafe_allow_html=True)
 
-    # DOMAIN ANALYSIS
+@st.fragment
+@traced_section
+def domain_analysis():
+    """Finance impact per business domain"""
+    filter_result = st.session_state["filter_result"]
+    
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.markdown('<h3 class="section-header">🏢 Business Domain Analysis</h3>', unsafe_allow_html=True)
     
-    if "Domain" in filtered_df.columns:
-        domain_finance = filtered_df.groupby("Domain")["Savings_Finance"].sum().reset_index()
-        domain_finance = domain_finance.sort_values("Savings_Finance", ascending=True)
-        
-        n_domains = len(domain_finance)
-        domain_colors = [mckinsey_blues[i % len(mckinsey_blues)] for i in range(n_domains)]
-        
-        fig_domain = go.Figure()
-        
-        fig_domain.add_trace(go.Bar(
-            x=domain_finance["Savings_Finance"],
-            y=domain_finance["Domain"],
-            orientation='h',
-            marker=dict(
-                color=domain_colors,
-                line=dict(color='white', width=1)
-            ),
-            text=[f"${val:,.0f}" for val in domain_finance["Savings_Finance"]],
-            textposition="outside",
-            hovertemplate="<b>Domain:</b> %{y}<br><b>Financial Impact:</b> $%{x:,.0f}<extra></extra>"
-        ))
-        
-        fig_domain.update_layout(
-            title={
-                'text': "Financial Impact by Business Domain",
-                'x': 0.5,
-                'font': {'size': 18, 'color': '#003366', 'family': 'Helvetica Neue'}
-            },
-            xaxis_title="Financial Impact ($)",
-            yaxis_title="Business Domain",
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            font=dict(size=11, color="#003366"),
-            height=max(400, n_domains * 45),
-            showlegend=False,
-            xaxis=dict(showgrid=True, gridcolor='#f0f0f0', gridwidth=1),
-            yaxis=dict(showgrid=False)
-        )
-        
-        st.plotly_chart(fig_domain, use_container_width=True)
+    domain_finance = filter_result.series["finance_by_domain"]
+    if domain_finance is not None:
+        fig_domain = cached_domain_figure(domain_finance)
+        with span("chart render"):
+            st.plotly_chart(fig_domain, width="stretch")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-    # PORTFOLIO OVERVIEW
+def portfolio_overview(summary):
     st.markdown('<h2 class="section-header">📋 Portfolio Overview</h2>', unsafe_allow_html=True)
     
     portfolio_col1, portfolio_col2, portfolio_col3, portfolio_col4 = st.columns(4)
     
     with portfolio_col1:
-        st.metric("Active Contracts", len(filtered_df))
+        st.metric("Active Contracts", summary["count"])
     
     with portfolio_col2:
-        avg_finance = filtered_df["Savings_Finance"].mean()
+        avg_finance = summary["avg_finance"]
         st.metric("Avg Finance Impact", f"${avg_finance:,.0f}")
     
     with portfolio_col3:
-        avg_scp = filtered_df["Savings_SCP"].mean()
+        avg_scp = summary["avg_scp"]
         st.metric("Avg SCP Impact", f"${avg_scp:,.0f}")
     
     with portfolio_col4:
-        if "Domain" in filtered_df.columns:
-            unique_domains = filtered_df["Domain"].nunique()
+        if summary["domains"] is not None:
+            unique_domains = summary["domains"]
             st.metric("Business Domains", unique_domains)
 
-    # Data export section
+@st.fragment
+@traced_section
+def data_export():
+    """Summary and portfolio downloads; clicking one only reruns this fragment"""
+    dataset = st.session_state["dataset"]
+    filter_spec = st.session_state["filter_spec"]
+    filter_result = st.session_state["filter_result"]
+    summary = filter_result.summary
+    
     st.markdown("### 💾 Data Export")
     
-    total_records = len(filtered_df)
-    if total_records != len(df):
-        st.markdown(f'<div class="data-summary">Portfolio Analysis: {total_records:,} contracts selected from {len(df):,} total records</div>', unsafe_allow_html=True)
+    total_records = summary["count"]
+    lake = st.session_state["lake"]
+    # The lake's dataset only holds the partitions of this selection
+    all_records = lake.row_count if lake is not None else dataset.row_count
+    if total_records != all_records:
+        st.markdown(f'<div class="data-summary">Portfolio Analysis: {total_records:,} contracts selected from {all_records:,} total records</div>', unsafe_allow_html=True)
     else:
         st.markdown(f'<div class="data-summary">Complete Portfolio Analysis: {total_records:,} active contracts</div>', unsafe_allow_html=True)
 
     export_col1, export_col2 = st.columns(2)
     
+    # Payloads are only built when a button is clicked, then cached per filter selection
     with export_col1:
-        summary_data = {
-            'Metric': ['Net Finance Impact', 'Finance Upside', 'Finance Exposure', 'Net SCP Impact', 'SCP Upside', 'SCP Exposure'],
-            'Value': [total_finance_savings, gains_finance, abs(risks_finance), total_scp_savings, gains_scp, abs(risks_scp)]
-        }
-        summary_df = pd.DataFrame(summary_data)
-        csv_summary = summary_df.to_csv(index=False)
         st.download_button(
             label="📊 Download Executive Summary",
-            data=csv_summary,
+            data=partial(summary_csv, dataset, filter_spec, summary),
             file_name=f"executive_summary_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
             mime="text/csv"
         )
     
     with export_col2:
-        csv_data = filtered_df.to_csv(index=False)
+        export_format = st.selectbox(
+            "Portfolio Data format",
+            options=available_formats(),
+            index=0,
+            help="Parquet and Feather keep column types and load several times faster than CSV"
+        )
+        export_spec = EXPORT_FORMATS[export_format]
+        
+        export_bytes = export_size(dataset, filter_spec, export_format)
+        if export_bytes is None and st.button("📏 Show File Size"):
+            export_bytes = len(portfolio_export(dataset, filter_spec, filter_result.rows, export_format))
+        if export_bytes is not None:
+            st.caption(f"File size: {format_bytes(export_bytes)}")
+        
         st.download_button(
             label="📁 Download Portfolio Data",
-            data=csv_data,
-            file_name=f"portfolio_analysis_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv"
+            data=partial(portfolio_export, dataset, filter_spec, filter_result.rows, export_format),
+            file_name=f"portfolio_analysis_{datetime.now().strftime('%Y%m%d_%H%M')}{export_spec.extension}",
+            mime=export_spec.mime
         )
 
+@st.fragment
+@traced_section
+def dashboard():
+    """Filters and every section computed from them
+
+    A filter change reruns this fragment (and the fragments nested in it)
+    instead of the whole script, so the CSS, sidebar and data load are skipped.
+    """
+    dataset = st.session_state["dataset"]
+    lake = st.session_state["lake"]
+    # The widgets offer every value of the lake, not just the partitions read so far
+    choices = lake if lake is not None else dataset
+    
+    # FILTERS SECTION
+    st.markdown('<div class="filter-section">', unsafe_allow_html=True)
+    st.markdown('<h3 class="section-header">📊 Business Intelligence Filters</h3>', unsafe_allow_html=True)
+    
+    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
+    
+    with filter_col1:
+        if "Contract Start" in choices.date_bounds:
+            min_start_date, max_start_date = choices.date_bounds["Contract Start"]
+            if pd.notna(min_start_date) and pd.notna(max_start_date):
+                start_date_filter = st.date_input(
+                    "Contract Start Date",
+                    value=min_start_date.date(),
+                    min_value=min_start_date.date(),
+                    max_value=max_start_date.date()
+                )
+            else:
+                start_date_filter = None
+        else:
+            start_date_filter = None
+
+    with filter_col2:
+        if "Contract End" in choices.date_bounds:
+            min_end_date, max_end_date = choices.date_bounds["Contract End"]
+            if pd.notna(min_end_date) and pd.notna(max_end_date):
+                end_date_filter = st.date_input(
+                    "Contract End Date",
+                    value=max_end_date.date(),
+                    min_value=min_end_date.date(),
+                    max_value=max_end_date.date()
+                )
+            else:
+                end_date_filter = None
+        else:
+            end_date_filter = None
+
+    with filter_col3:
+        if "FY of Savings-Finance" in choices.options:
+            finance_fy_options = ["All"] + choices.options["FY of Savings-Finance"]
+            finance_fy_filter = st.selectbox(
+                "Finance FY",
+                options=finance_fy_options,
+                index=0
+            )
+        else:
+            finance_fy_filter = "All"
+
+    with filter_col4:
+        if "FY of Savings-SCP" in choices.options:
+            scp_fy_options = ["All"] + choices.options["FY of Savings-SCP"]
+            scp_fy_filter = st.selectbox(
+                "SCP FY",
+                options=scp_fy_options,
+                index=0
+            )
+        else:
+            scp_fy_filter = "All"
+
+    # Domain filter
+    if "Domain" in choices.options:
+        domain_options = ["All Domains"] + choices.options["Domain"]
+        domain_filter = st.selectbox(
+            "🏢 Business Domain",
+            options=domain_options,
+            index=0
+        )
+    else:
+        domain_filter = "All Domains"
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Apply filters - bitmap AND over the dataset's filter index, one gather at the end
+    filter_spec = FilterSpec(
+        start_date=start_date_filter or None,
+        end_date=end_date_filter or None,
+        finance_fy=None if finance_fy_filter == "All" else finance_fy_filter,
+        scp_fy=None if scp_fy_filter == "All" else scp_fy_filter,
+        domain=None if domain_filter == "All Domains" else domain_filter,
+    )
+    if lake is not None:
+        # Only the partitions and row groups this selection touches are read
+        dataset = lake.dataset(filter_spec)
+        st.session_state["dataset"] = dataset
+
+    # Row selection, insights and chart series are memoised per (dataset version, filters)
+    st.session_state["filter_spec"] = filter_spec
+    with span("query") as queried:
+        st.session_state["filter_result"] = query(dataset, filter_spec)
+        queried.rows = len(st.session_state["filter_result"].rows)
+    summary = st.session_state["filter_result"].summary
+
+    # EXECUTIVE SUMMARY - NEW 3-COLUMN HORIZONTAL LAYOUT
+    executive_summary(summary)
+
+    # STRATEGIC ANALYTICS SECTION
+    strategic_charts()
+
+    # DOMAIN ANALYSIS
+    domain_analysis()
+
+    # PORTFOLIO OVERVIEW
+    portfolio_overview(summary)
+
+    # Data export section
+    data_export()
+
+    # Cache diagnostics go last so they include this rerun's lookups
+    with cache_diagnostics.container():
+        with st.expander("🧮 Query Cache"):
+            st.caption(f"Engine: {dataset.engine.name if dataset.engine is not None else 'pandas'}")
+            cache_stats = result_cache.stats()
+            hit_rate = cache_stats["hit_rate"]
+            st.caption(f"Hits: {cache_stats['hits']:,} · Misses: {cache_stats['misses']:,} · Hit rate: {hit_rate:.0%}" if hit_rate is not None else "No lookups yet")
+            st.caption(f"Entries: {cache_stats['entries']:,} · Memory: {format_bytes(cache_stats['bytes'])} · Evictions: {cache_stats['evictions']:,}")
+            figure_stats = figure_cache.stats()
+            st.caption(f"Figures: {figure_stats['hits']:,} reused · {figure_stats['misses']:,} built · {figure_stats['entries']:,} cached")
+            export_stats = export_cache.stats()
+            st.caption(f"Exports: {export_stats['hits']:,} reused · {export_stats['misses']:,} built · {format_bytes(export_stats['bytes'])} cached")
+    
+    # Drawn from here (not the end of the script) so filter-only reruns refresh it too
+    show_performance(current_trace())
+
+if has_data:
+    dashboard()
+
 else:
-    # Error handling
-    st.error("Unable to load data from OneDrive")
+    # An empty Parquet lake was already reported above; the rest is about OneDrive
+    if lake is None:
+        st.error("Unable to load data from OneDrive")
     
-    with st.expander("🔧 Troubleshooting"):
-        st.markdown("""
-        **OneDrive Connection Issues:**
+        with st.expander("🔧 Troubleshooting"):
+            st.markdown("""
+            **OneDrive Connection Issues:**
+        
+            1. **File Sharing Settings**
+               - Ensure the file is shared with "Anyone with the link can view"
+               - Re-copy the sharing link after changing permissions
+        
+            2. **URL Format**
+               - Paste the full sharing URL, including the `resid=` parameter
+               - Short `1drv.ms` links are also supported
         
-        1. **File Sharing Settings**
-           - Ensure
+            3. **Workbook Structure**
+               - The workbook must contain a `Savings_WIP_Data` sheet
+        
+            4. **Local Backup**
+               - Place `SCP_Savings_FY26_dummy_v3.xlsx` next to `app.py` to use it as a fallback
+            """)
+    
+    show_performance(run_trace)
+
+finish_trace()
@@ -0,0 +1,85 @@
+# bench_charts.py - Per-bar trace loop vs single vectorised trace for the fiscal-year charts
+#
+# Usage: python benchmarks/bench_charts.py [--bars 5 20 100 500] [--repeat 5]
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from charts import fiscal_year_figure, palette
+
+
+def per_bar_figure(data):
+    """The fiscal-year chart as app.py used to build it: one trace per bar"""
+    colors = palette(len(data))
+    fig = go.Figure()
+    for i, row in data.iterrows():
+        fig.add_trace(go.Bar(
+            x=[row["FY of Savings-Finance"]],
+            y=[row["Savings_Finance"]],
+            name=row["FY of Savings-Finance"],
+            marker_color=colors[i],
+            text=f"${row['Savings_Finance']:,.0f}",
+            textposition="outside",
+            showlegend=False,
+            hovertemplate=f"<b>FY:</b> {row['FY of Savings-Finance']}<br><b>Impact:</b> ${row['Savings_Finance']:,.0f}<extra></extra>"
+        ))
+    # Same layout as the production chart so only the trace construction differs
+    fig.update_layout(
+        title={'text': "Finance Impact by Fiscal Year", 'x': 0.5, 'font': {'size': 18, 'color': '#003366', 'family': 'Helvetica Neue'}},
+        xaxis_title="Fiscal Year",
+        yaxis_title="Financial Impact ($)",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(size=11, color="#003366"),
+        height=450,
+        xaxis=dict(showgrid=False, tickangle=0),
+        yaxis=dict(showgrid=True, gridcolor='#f0f0f0', gridwidth=1)
+    )
+    return fig
+
+
+def single_trace_figure(data):
+    return fiscal_year_figure(data, "FY of Savings-Finance", "Savings_Finance", "Finance Impact by Fiscal Year", "Financial Impact ($)")
+
+
+def best_of(repeat, build, data):
+    build_times, json_times, size = [], [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build(data)
+        built = time.perf_counter()
+        payload = fig.to_json()
+        build_times.append(built - start)
+        json_times.append(time.perf_counter() - built)
+        size = len(payload)
+    return min(build_times), min(json_times), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, nargs="+", default=[5, 20, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'bars':>6}  {'builder':<14}{'build (ms)':>12}{'to_json (ms)':>14}{'JSON (KB)':>11}")
+    for bars in args.bars:
+        data = pd.DataFrame({
+            "FY of Savings-Finance": [f"FY{20 + i:02d}" if bars < 80 else f"FY{i:04d}" for i in range(bars)],
+            "Savings_Finance": np.random.default_rng(bars).normal(0, 1e6, bars),
+        })
+        for label, build in (("per-bar loop", per_bar_figure), ("single trace", single_trace_figure)):
+            build_time, json_time, size = best_of(args.repeat, build, data)
+            print(f"{bars:>6}  {label:<14}{build_time * 1e3:>12.1f}{json_time * 1e3:>14.1f}{size / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# bench_engines.py - Query engines (SCP_QUERY_ENGINE): parity with pandas and per-selection latency
+#
+# Usage: python benchmarks/bench_engines.py [--rows 1000000] [--repeat 3] [--engines pandas duckdb polars]
+#
+# Builds one dataset per engine from a generated frame (--rows 0 reads
+# SCP_Savings_FY26_dummy_v3.xlsx) and runs every Finance FY, SCP FY and
+# Domain value, a few combinations and custom date ranges through
+# analytics.query with the result cache cleared. Each engine's rows, KPIs
+# and chart series must match the pandas engine: identical row positions
+# and labels, numbers equal to 1e-9 relative (summation order differs).
+# Exits with status 1 on any mismatch.
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from analytics import FilterSpec, query, result_cache
+from dataset import build_dataset
+from engines import available_engines
+from synthetic_workbook import synthetic_savings_frame
+from workbook import preprocess_savings_data, read_sheet
+
+DUMMY_WORKBOOK = os.path.join(ROOT, "SCP_Savings_FY26_dummy_v3.xlsx")
+
+
+def selections(dataset):
+    """The filter selections to compare, default date window first"""
+    window = dataset.default_window()
+    specs = [FilterSpec(window[0], window[1], None, None, None)]
+    for field, column in (("finance_fy", "FY of Savings-Finance"), ("scp_fy", "FY of Savings-SCP"), ("domain", "Domain")):
+        for value in dataset.options.get(column, []) + ["(unknown)"]:
+            specs.append(FilterSpec(window[0], window[1], None, None, None)._replace(**{field: value}))
+    domains = dataset.options.get("Domain", [])[:3]
+    years = dataset.options.get("FY of Savings-Finance", [])[:3]
+    specs += [FilterSpec(window[0], window[1], year, None, domain) for domain in domains for year in years]
+
+    low, high = dataset.date_bounds.get("Contract Start", (None, None))
+    if low is not None:
+        middle = (low + (high - low) / 2).date()
+        specs += [
+            FilterSpec(middle, window[1], None, None, None),
+            FilterSpec(window[0], middle, None, None, None),
+            FilterSpec(middle, None, years[0] if years else None, None, domains[0] if domains else None),
+            FilterSpec(None, None, None, None, None),
+        ]
+    return specs
+
+
+def mismatches(expected, actual):
+    """Differences between two ``FilterResult``s, as readable strings"""
+    problems = []
+    if not np.array_equal(expected.rows, actual.rows):
+        problems.append(f"rows: {len(expected.rows)} vs {len(actual.rows)}")
+    for key, value in expected.summary.items():
+        other = actual.summary[key]
+        if value is None or other is None:
+            same = value is other
+        else:
+            same = np.isclose(value, other, rtol=1e-9, atol=1e-6, equal_nan=True)
+        if not same:
+            problems.append(f"{key}: {value!r} vs {other!r}")
+    for key, data in expected.series.items():
+        other = actual.series[key]
+        if data is None or other is None:
+            if data is not other:
+                problems.append(f"{key}: {data is None} vs {other is None}")
+            continue
+        if list(data.columns) != list(other.columns):
+            problems.append(f"{key} columns: {list(data.columns)} vs {list(other.columns)}")
+        elif data.iloc[:, 0].astype(str).tolist() != other.iloc[:, 0].astype(str).tolist():
+            problems.append(f"{key} labels: {data.iloc[:, 0].tolist()} vs {other.iloc[:, 0].tolist()}")
+        elif not np.allclose(data.iloc[:, 1].to_numpy(float), other.iloc[:, 1].to_numpy(float), rtol=1e-9, atol=1e-6):
+            problems.append(f"{key} values differ")
+    return problems
+
+
+def timed_query(dataset, spec, repeat):
+    timings = []
+    for _ in range(repeat):
+        result_cache.clear()
+        start = time.perf_counter()
+        result = query(dataset, spec)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="generated rows; 0 reads the dummy workbook")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engines", nargs="+", default=available_engines())
+    args = parser.parse_args()
+
+    if args.rows:
+        raw = synthetic_savings_frame(args.rows, full_sheet=False)
+    else:
+        raw, _ = read_sheet(DUMMY_WORKBOOK)
+    raw = preprocess_savings_data(raw)
+
+    engines = ["pandas"] + [name for name in args.engines if name != "pandas"]
+    datasets = {}
+    for name in engines:
+        start = time.perf_counter()
+        datasets[name] = build_dataset(raw, engine=name)
+        print(f"{name:<8} dataset build {time.perf_counter() - start:6.2f}s")
+
+    specs = selections(datasets["pandas"])
+    print(f"\n{len(raw):,} rows · {len(specs)} selections · best of {args.repeat}, result cache cleared\n")
+    print(f"{'engine':<8}{'p50 (ms)':>11}{'p95 (ms)':>11}{'max (ms)':>11}{'vs pandas':>11}   parity")
+
+    expected = {}
+    failures = []
+    pandas_p50 = None
+    for name in engines:
+        timings = []
+        for spec in specs:
+            seconds, result = timed_query(datasets[name], spec, args.repeat)
+            timings.append(seconds)
+            if name == "pandas":
+                expected[spec] = result
+            else:
+                failures += [f"{name} {spec}: {problem}" for problem in mismatches(expected[spec], result)]
+        timings = np.array(timings) * 1000
+        p50, p95 = np.percentile(timings, [50, 95])
+        pandas_p50 = pandas_p50 or p50
+        parity = "reference" if name == "pandas" else ("ok" if not any(f.startswith(f"{name} ") for f in failures) else "MISMATCH")
+        print(f"{name:<8}{p50:>11.2f}{p95:>11.2f}{timings.max():>11.2f}{pandas_p50 / p50:>10.1f}x   {parity}")
+
+    if failures:
+        print("\n" + "\n".join(failures[:20]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
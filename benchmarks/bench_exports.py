@@ -0,0 +1,92 @@
+# bench_exports.py - Portfolio Data export formats: write time, size and downstream load time
+#
+# Usage: python benchmarks/bench_exports.py [--rows 200000] [--repeat 3]
+
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from dataset import build_dataset, format_bytes
+from exports import EXPORT_FORMATS, available_formats, iter_row_chunks
+
+DOMAINS = ["Database", "Network", "Security", "Storage", "Compute", "Collaboration", "ERP", "Analytics"]
+VENDORS = [f"Vendor {i:03d}" for i in range(250)]
+FISCAL_YEARS = ["FY24", "FY25", "FY26", "FY27"]
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 1000, rows), unit="D")
+    finance = rng.normal(0, 25_000, rows).round(2)
+    return pd.DataFrame({
+        "Domain": rng.choice(DOMAINS, rows),
+        "Forecast ID": [f"F-{i:08d}" for i in range(rows)],
+        "Vendor": rng.choice(VENDORS, rows),
+        "Contract Start": start,
+        "Contract End": start + pd.to_timedelta(rng.integers(90, 1100, rows), unit="D"),
+        "FY of Savings-SCP": rng.choice(FISCAL_YEARS, rows),
+        "FY of Savings-Finance": rng.choice(FISCAL_YEARS, rows),
+        "Contract Amount (PA)": rng.uniform(1_000, 500_000, rows).round(2),
+        "Savings_Finance": finance,
+        "Savings_SCP": finance,
+    })
+
+
+def read_back(name, payload):
+    """Load an export the way a downstream notebook would"""
+    if name == "Parquet":
+        return pd.read_parquet(io.BytesIO(payload))
+    if name == "Feather":
+        return pd.read_feather(io.BytesIO(payload))
+    compression = {"CSV (gzip)": "gzip", "CSV (zstd)": "zstd"}.get(name)
+    if compression == "zstd":
+        payload = pa.CompressedInputStream(pa.BufferReader(payload), "zstd").read()
+        compression = None
+    return pd.read_csv(io.BytesIO(payload), compression=compression, parse_dates=["Contract Start", "Contract End"])
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def write(dataset, rows, name):
+    sink = pa.BufferOutputStream()
+    EXPORT_FORMATS[name].write(iter_row_chunks(dataset, rows), sink)
+    return sink.getvalue().to_pybytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = build_dataset(synthetic_frame(args.rows))
+    rows = np.arange(dataset.row_count)
+
+    print(f"{'format':<12}{'write (s)':>11}{'size':>12}{'load (s)':>11}{'load vs CSV':>13}")
+    csv_load = None
+    for name in available_formats():
+        write_time, payload = best_of(args.repeat, write, dataset, rows, name)
+        load_time, loaded = best_of(args.repeat, read_back, name, payload)
+        assert len(loaded) == dataset.row_count
+        csv_load = csv_load or load_time
+        print(f"{name:<12}{write_time:>11.2f}{format_bytes(len(payload)):>12}{load_time:>11.3f}{csv_load / load_time:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench_fetch.py - Sequential vs raced OneDrive download strategies against a stub server
+#
+# Usage: python benchmarks/bench_fetch.py [--stall SECONDS] [--timeout SECONDS]
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+import onedrive
+import transport
+from stub_onedrive import StubOneDrive
+
+SCENARIOS = {
+    "all succeed": {"/api": "ok", "/direct": "ok", "/cleaned": "ok"},
+    "api stalls": {"/api": "stall", "/direct": "ok", "/cleaned": "ok"},
+    "api + direct stall": {"/api": "stall", "/direct": "stall", "/cleaned": "ok"},
+    "api fails, direct html": {"/api": "fail", "/direct": "html", "/cleaned": "ok"},
+    "all fail": {"/api": "fail", "/direct": "html", "/cleaned": "fail"},
+}
+
+
+def parse(workbook, sha256):
+    return pd.read_excel(workbook, sheet_name="Savings_WIP_Data")
+
+
+def candidates_for(stub):
+    return [
+        {"name": name, "url": stub.url(f"/{name}"), "headers": {}, "message": name}
+        for name in ("api", "direct", "cleaned")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stall", type=float, default=3.0, help="seconds a stalled strategy hangs")
+    parser.add_argument("--timeout", type=float, default=2.0, help="per-request timeout")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<26}{'sequential':>14}{'race':>14}  winner (seq / race)")
+    for scenario, behaviours in SCENARIOS.items():
+        row = []
+        for fetch in (onedrive.first_workbook, onedrive.race_workbooks):
+            onedrive.revalidation_cache.clear()
+            transport.breaker.reset()
+            with StubOneDrive(behaviours, workbook_path=os.path.join(ROOT, "SCP_Savings_FY26_dummy_v3.xlsx"), stall_seconds=args.stall) as stub:
+                start = time.perf_counter()
+                df, winner = fetch(candidates_for(stub), parse, timeout=args.timeout)
+                elapsed = time.perf_counter() - start
+            row.append((elapsed, winner if df is not None else "-"))
+        (seq_time, seq_winner), (race_time, race_winner) = row
+        print(f"{scenario:<26}{seq_time:>13.2f}s{race_time:>13.2f}s  {seq_winner} / {race_winner}")
+
+    print()
+    for row in transport.breaker.snapshot():
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
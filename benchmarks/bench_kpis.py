@@ -0,0 +1,79 @@
+# bench_kpis.py - Fused KPI kernel vs the per-KPI pandas passes it replaced
+#
+# Usage: python benchmarks/bench_kpis.py [--sizes 10000 1000000 10000000] [--repeat 5]
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from analytics import kpi_kernel, measure_arrays
+
+DOMAINS = ["Database", "Network", "Security", "Storage", "Compute", "Collaboration", "ERP", "Analytics"]
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    finance = rng.normal(0, 25_000, rows).round(2)
+    return pd.DataFrame({
+        "Domain": pd.Categorical.from_codes(rng.integers(0, len(DOMAINS), rows), DOMAINS),
+        "Savings_Finance": finance,
+        "Savings_SCP": np.where(rng.random(rows) < 0.8, finance, rng.normal(0, 25_000, rows).round(2)),
+    })
+
+
+def pandas_summary(df):
+    """The Executive Summary / Portfolio Overview code as it was in app.py"""
+    return {
+        "total_finance": df["Savings_Finance"].sum(),
+        "gains_finance": df.loc[df["Savings_Finance"] > 0, "Savings_Finance"].sum(),
+        "risks_finance": df.loc[df["Savings_Finance"] < 0, "Savings_Finance"].sum(),
+        "total_scp": df["Savings_SCP"].sum(),
+        "gains_scp": df.loc[df["Savings_SCP"] > 0, "Savings_SCP"].sum(),
+        "risks_scp": df.loc[df["Savings_SCP"] < 0, "Savings_SCP"].sum(),
+        "count": len(df),
+        "avg_finance": df["Savings_Finance"].mean(),
+        "avg_scp": df["Savings_SCP"].mean(),
+        "domains": df["Domain"].nunique(),
+    }
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}  {'selection':<10}{'pandas (ms)':>14}{'kernel (ms)':>14}{'speedup':>10}")
+    for rows in args.sizes:
+        df = synthetic_frame(rows)
+        measures, domain_codes, domain_count = measure_arrays(df)
+        half = np.flatnonzero(np.random.default_rng(1).random(rows) < 0.5)
+
+        for label, selection in (("all rows", None), ("50% rows", half)):
+            # The pandas path pays for materialising the filtered frame, as app.py did
+            subset = df if selection is None else df.take(selection)
+            pandas_time, expected = best_of(args.repeat, pandas_summary, subset)
+            kernel_time, actual = best_of(args.repeat, kpi_kernel, measures, domain_codes, domain_count, selection)
+            for key, value in expected.items():
+                assert np.isclose(actual[key], value, rtol=1e-9, atol=1e-6), (key, actual[key], value)
+            print(f"{rows:>12,}  {label:<10}{pandas_time * 1e3:>14.2f}{kernel_time * 1e3:>14.2f}{pandas_time / kernel_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
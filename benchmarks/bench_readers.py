@@ -0,0 +1,73 @@
+# bench_readers.py - Compare the workbook reader engines on a large synthetic workbook
+#
+# Usage: python benchmarks/bench_readers.py [--rows 200000] [--repeat 1]
+#
+# The synthetic workbook tiles the rows of SCP_Savings_FY26_dummy_v3.xlsx
+# up to --rows and is cached in the temp directory between runs.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import openpyxl
+import pandas as pd
+
+import workbook
+
+SOURCE_WORKBOOK = os.path.join(ROOT, "SCP_Savings_FY26_dummy_v3.xlsx")
+
+
+def build_synthetic_workbook(rows, path):
+    """Write a Savings_WIP_Data sheet with ``rows`` rows tiled from the dummy workbook"""
+    source = openpyxl.load_workbook(SOURCE_WORKBOOK, read_only=True, data_only=True)
+    template = list(source[workbook.SHEET_NAME].iter_rows(values_only=True))
+    source.close()
+    header, body = template[0], template[1:]
+
+    out = openpyxl.Workbook(write_only=True)
+    sheet = out.create_sheet(workbook.SHEET_NAME)
+    sheet.append(header)
+    for i in range(rows):
+        sheet.append(body[i % len(body)])
+    out.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.gettempdir(), f"scp_savings_synthetic_{args.rows}.xlsx")
+    if not os.path.exists(path):
+        print(f"Building {args.rows:,}-row workbook at {path} ...")
+        start = time.perf_counter()
+        build_synthetic_workbook(args.rows, path)
+        print(f"  built in {time.perf_counter() - start:.1f}s ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    results = {}
+    print(f"\n{'engine':<16}{'best (s)':>10}{'rows':>10}")
+    for engine in workbook.available_engines():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            df = workbook.read_savings_workbook(path, engine=engine)
+            timings.append(time.perf_counter() - start)
+        results[engine] = df
+        print(f"{engine:<16}{min(timings):>10.2f}{len(df):>10,}")
+
+    # Every engine has to produce the same frame, dtypes included; blank and
+    # text cells are covered by tests/test_workbook.py
+    reference = results["openpyxl"]
+    for engine, df in results.items():
+        pd.testing.assert_frame_equal(df, reference)
+    print("\nAll engines returned identical frames")
+
+
+if __name__ == "__main__":
+    main()
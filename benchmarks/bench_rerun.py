@@ -0,0 +1,220 @@
+# bench_rerun.py - End-to-end dashboard rerun latency and memory under scripted filter clicks
+#
+# Usage: python benchmarks/bench_rerun.py [--rows 10000] [--repeat 3] [--max-p95-ms 750]
+#                                         [--max-rss-mb 1500] [--baseline FILE] [--max-regression 0.25]
+#                                         [--output FILE]
+#
+# Runs app.py headless with streamlit.testing.v1.AppTest. OneDrive is replaced
+# by the local stub server (stub_onedrive.py) serving a generated workbook
+# (--rows 0 serves SCP_Savings_FY26_dummy_v3.xlsx), so the real download,
+# parse and snapshot path is exercised without network access. Each sequence
+# drives one set of filter widgets; every widget change is one timed rerun.
+# AppTest always reruns the whole script, so the numbers are an upper bound
+# for a browser click, which only reruns the dashboard fragment.
+#
+# Exits with status 1 when a sequence's p95 exceeds --max-p95-ms, the peak
+# RSS exceeds --max-rss-mb, or a p50 regresses by more than --max-regression
+# against a previous --output file passed as --baseline.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Module-level config of the app; set before anything imports it
+os.environ.setdefault("SCP_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="scp_bench_snapshots_"))
+os.environ.setdefault("SCP_REFRESH_INTERVAL", "86400")
+
+from streamlit.testing.v1 import AppTest
+
+import onedrive
+from stub_onedrive import StubOneDrive
+from synthetic_workbook import cached_workbook
+
+APP_PATH = os.path.join(ROOT, "app.py")
+DUMMY_WORKBOOK = os.path.join(ROOT, "SCP_Savings_FY26_dummy_v3.xlsx")
+STUB_MESSAGE = "OneDrive file loaded successfully via API (stub)"
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _cycle_selectbox(label):
+    def steps(at):
+        options = _widget(at.selectbox, label).options
+        # Every value once, then back to the default
+        for value in options[1:] + options[:1]:
+            yield f"{label} = {value}", lambda at, value=value: _widget(at.selectbox, label).select(value)
+    return steps
+
+
+def _date_steps(at):
+    start = _widget(at.date_input, "Contract Start Date")
+    end = _widget(at.date_input, "Contract End Date")
+    low, high = start.min, end.max
+    span_days = (high - low).days
+    for fraction in (0.25, 0.5, 0.75):
+        value = low + (high - low) * fraction if span_days else low
+        yield f"start >= {value}", lambda at, value=value: _widget(at.date_input, "Contract Start Date").set_value(value)
+    yield "start reset", lambda at: _widget(at.date_input, "Contract Start Date").set_value(low)
+    for fraction in (0.75, 0.5):
+        value = low + (high - low) * fraction if span_days else high
+        yield f"end <= {value}", lambda at, value=value: _widget(at.date_input, "Contract End Date").set_value(value)
+    yield "end reset", lambda at: _widget(at.date_input, "Contract End Date").set_value(high)
+
+
+def _combined_steps(at):
+    domains = _widget(at.selectbox, "🏢 Business Domain").options
+    finance_years = _widget(at.selectbox, "Finance FY").options
+    for domain in domains[1:3]:
+        for year in finance_years[1:3]:
+            yield f"{domain} / {year}", lambda at, domain=domain, year=year: (
+                _widget(at.selectbox, "🏢 Business Domain").select(domain),
+                _widget(at.selectbox, "Finance FY").select(year),
+            )
+    yield "reset", lambda at: (
+        _widget(at.selectbox, "🏢 Business Domain").select(domains[0]),
+        _widget(at.selectbox, "Finance FY").select(finance_years[0]),
+    )
+
+
+SEQUENCES = {
+    "finance_fy": _cycle_selectbox("Finance FY"),
+    "scp_fy": _cycle_selectbox("SCP FY"),
+    "domain": _cycle_selectbox("🏢 Business Domain"),
+    "dates": _date_steps,
+    "combined": _combined_steps,
+}
+
+
+def stub_candidates(stub):
+    def download_candidates(onedrive_url):
+        return [{"name": "api", "url": stub.url("/api"), "headers": {}, "message": STUB_MESSAGE}]
+    return download_candidates
+
+
+def run_sequence(at, steps, trace_memory=False):
+    """Apply each step and rerun; returns per-step (label, seconds, peak traced bytes)"""
+    timings = []
+    for label, apply in list(steps(at)):
+        apply(at)
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+        if at.exception:
+            raise RuntimeError(f"{label}: {at.exception[0].value}")
+        timings.append((label, elapsed, peak))
+    return timings
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000, help="generated workbook rows; 0 serves the dummy workbook")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over every sequence")
+    parser.add_argument("--max-p95-ms", type=float, default=750.0)
+    parser.add_argument("--max-rss-mb", type=float, default=1500.0)
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare p50s against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p50 growth over --baseline")
+    parser.add_argument("--output", help="write the results JSON here")
+    args = parser.parse_args()
+
+    workbook_path = DUMMY_WORKBOOK if args.rows == 0 else cached_workbook(args.rows)
+
+    with StubOneDrive({"/api": "ok"}, workbook_path=workbook_path) as stub:
+        onedrive.download_candidates = stub_candidates(stub)
+
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+        start = time.perf_counter()
+        at.run()
+        cold_seconds = time.perf_counter() - start
+        if at.exception:
+            raise SystemExit(f"first run failed: {at.exception[0].value}")
+        if not any(STUB_MESSAGE in element.value for element in at.success):
+            raise SystemExit("the app did not load the workbook from the stub")
+
+        results = {}
+        for name, steps in SEQUENCES.items():
+            # Warm the result and figure caches once, then time
+            run_sequence(at, steps)
+            seconds = []
+            for _ in range(args.repeat):
+                seconds += [elapsed for _, elapsed, _ in run_sequence(at, steps)]
+            peak_traced = max(peak for _, _, peak in run_sequence(at, steps, trace_memory=True))
+            results[name] = {
+                "interactions": len(seconds),
+                "p50_ms": round(statistics.median(seconds) * 1000, 1),
+                "p95_ms": round(percentile(seconds, 0.95) * 1000, 1),
+                "max_ms": round(max(seconds) * 1000, 1),
+                "peak_alloc_mb": round(peak_traced / 2**20, 1),
+            }
+
+    report = {
+        "rows": args.rows,
+        "cold_start_s": round(cold_seconds, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "sequences": results,
+    }
+
+    source = f"{args.rows:,} rows" if args.rows else os.path.basename(DUMMY_WORKBOOK)
+    print(f"{source} · cold start {report['cold_start_s']} s · peak RSS {report['peak_rss_mb']} MB\n")
+    print(f"{'sequence':<12}{'clicks':>8}{'p50 (ms)':>11}{'p95 (ms)':>11}{'max (ms)':>11}{'alloc (MB)':>12}")
+    for name, row in results.items():
+        print(f"{name:<12}{row['interactions']:>8}{row['p50_ms']:>11}{row['p95_ms']:>11}{row['max_ms']:>11}{row['peak_alloc_mb']:>12}")
+
+    failures = []
+    for name, row in results.items():
+        if row["p95_ms"] > args.max_p95_ms:
+            failures.append(f"{name}: p95 {row['p95_ms']} ms > {args.max_p95_ms} ms")
+    if report["peak_rss_mb"] is not None and report["peak_rss_mb"] > args.max_rss_mb:
+        failures.append(f"peak RSS {report['peak_rss_mb']} MB > {args.max_rss_mb} MB")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, row in results.items():
+            before = baseline.get("sequences", {}).get(name)
+            if before and row["p50_ms"] > before["p50_ms"] * (1 + args.max_regression):
+                failures.append(f"{name}: p50 {row['p50_ms']} ms vs baseline {before['p50_ms']} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if failures:
+        print("\nREGRESSION\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nWithin thresholds")
+
+
+if __name__ == "__main__":
+    main()
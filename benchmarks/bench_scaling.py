@@ -0,0 +1,174 @@
+# bench_scaling.py - Dashboard pipeline stage timings on generated workbooks from 10k to 10M rows
+#
+# Usage: python benchmarks/bench_scaling.py [--sizes 10000 100000 1000000 10000000] [--repeat 3]
+#                                           [--xlsx-max-rows 100000] [--output benchmarks/results/scaling.jsonl]
+#
+# Stages: load (xlsx parse and Parquet snapshot read), preprocess, dataset
+# build, filter, KPI kernel, groupby, figure build and CSV export of one
+# Domain selection. Workbooks come from synthetic_workbook.py and are cached
+# in the temp directory. Sizes above --xlsx-max-rows (and always above the
+# Excel sheet limit) skip the xlsx parse and start from the Parquet snapshot.
+# Each run appends one JSON record to --output so results can be tracked
+# across commits. 10M rows needs roughly 10 GB of RAM, mostly for the
+# dataset build.
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io as pio
+import pyarrow
+
+from analytics import FilterSpec, chart_series, filtered_frame, kpi_kernel
+from charts import domain_figure, fiscal_year_figure
+from dataset import build_dataset
+from exports import iter_row_chunks, write_csv
+from synthetic_workbook import EXCEL_MAX_ROWS, cached_workbook, synthetic_savings_frame
+from workbook import preprocess_savings_data, read_sheet
+
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "scaling.jsonl")
+
+STAGES = [
+    "load_xlsx", "load_parquet", "preprocess", "build_dataset",
+    "filter", "kpi", "groupby", "figure_build", "csv_export",
+]
+
+# The largest domain of the generated data, about a third of the rows
+SELECTION = FilterSpec(start_date=None, end_date=None, finance_fy=None, scp_fy=None, domain="Hardware")
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def build_figures(series):
+    figures = [
+        fiscal_year_figure(series["finance_by_fy"], "FY of Savings-Finance", "Savings_Finance",
+                           "Finance Impact by Fiscal Year", "Financial Impact ($)"),
+        fiscal_year_figure(series["scp_by_fy"], "FY of Savings-SCP", "Savings_SCP",
+                           "SCP Impact by Fiscal Year", "SCP Impact ($)"),
+        domain_figure(series["finance_by_domain"]),
+    ]
+    return [pio.to_json(fig) for fig in figures]
+
+
+def export_csv(dataset, rows):
+    buffer = io.BytesIO()
+    write_csv(iter_row_chunks(dataset, rows), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def run_size(rows, repeat, xlsx_max_rows):
+    """Stage timings in seconds for one generated dataset of ``rows`` rows"""
+    stages = dict.fromkeys(STAGES)
+
+    if rows <= min(xlsx_max_rows, EXCEL_MAX_ROWS):
+        path = cached_workbook(rows)
+        # One parse is enough; it dwarfs everything else
+        stages["load_xlsx"], (raw, engine) = best_of(1, read_sheet, path)
+    else:
+        raw, engine = synthetic_savings_frame(rows, full_sheet=False), None
+
+    snapshot = os.path.join(tempfile.gettempdir(), f"scp_savings_generated_{rows}.parquet")
+    raw.to_parquet(snapshot, index=False)
+    del raw
+    stages["load_parquet"], raw = best_of(repeat, pd.read_parquet, snapshot)
+    os.remove(snapshot)
+
+    stages["preprocess"], raw = best_of(repeat, preprocess_savings_data, raw)
+    stages["build_dataset"], dataset = best_of(1, build_dataset, raw)
+    del raw
+
+    stages["filter"], selected = best_of(repeat, dataset.filter_index.select, SELECTION)
+    stages["kpi"], _ = best_of(repeat, kpi_kernel, dataset.measures, dataset.domain_codes, dataset.domain_count, selected)
+    stages["groupby"], series = best_of(repeat, lambda: chart_series(filtered_frame(dataset, selected)))
+    stages["figure_build"], _ = best_of(repeat, build_figures, series)
+    stages["csv_export"], csv_bytes = best_of(1, export_csv, dataset, selected)
+
+    return {
+        "rows": rows,
+        "selected_rows": int(len(selected)),
+        "xlsx_engine": engine,
+        "dataset_bytes": dataset.memory_after,
+        "csv_bytes": csv_bytes,
+        "peak_rss_mb": peak_rss_mb(),
+        "seconds": {stage: round(value, 6) if value is not None else None for stage, value in stages.items()},
+    }
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far (sizes run in ascending order)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--xlsx-max-rows", type=int, default=100_000,
+                        help="largest size whose .xlsx is generated and parsed (writing 1M rows takes ~10 min)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "versions": {
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "pyarrow": pyarrow.__version__,
+            "plotly": plotly.__version__,
+        },
+        "results": [],
+    }
+
+    print(f"{'rows':>12}" + "".join(f"{stage:>14}" for stage in STAGES) + "   (ms)")
+    for rows in args.sizes:
+        result = run_size(rows, args.repeat, args.xlsx_max_rows)
+        record["results"].append(result)
+        cells = ["-" if value is None else f"{value * 1e3:,.2f}" for value in result["seconds"].values()]
+        print(f"{rows:>12,}" + "".join(f"{cell:>14}" for cell in cells) + f"   peak RSS {result['peak_rss_mb']} MB")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nAppended results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# stub_onedrive.py - Local HTTP stand-in for the OneDrive download strategies
+
+import http.server
+import threading
+import time
+
+WORKBOOK_PATH = "SCP_Savings_FY26_dummy_v3.xlsx"
+
+
+class StubOneDrive:
+    """Serve the workbook on one path per strategy with a scripted behaviour
+
+    ``behaviours`` maps a path such as ``/api`` to ``"ok"`` (serve the
+    workbook), ``"stall"`` (sleep ``stall_seconds`` before answering),
+    ``"fail"`` (HTTP 500) or ``"html"`` (a 200 login page instead of a
+    workbook). Unknown paths answer 404.
+    """
+
+    def __init__(self, behaviours, workbook_path=WORKBOOK_PATH, stall_seconds=5.0, etag=None):
+        with open(workbook_path, "rb") as f:
+            self.workbook = f.read()
+        self.behaviours = dict(behaviours)
+        self.stall_seconds = stall_seconds
+        self.etag = etag
+        self.requests = []
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    self._respond()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on this strategy (timeout or lost race)
+                    pass
+
+            def _respond(self):
+                path = self.path.split("?")[0]
+                stub.requests.append((path, dict(self.headers)))
+                behaviour = stub.behaviours.get(path)
+
+                if behaviour == "stall":
+                    time.sleep(stub.stall_seconds)
+                    behaviour = "ok"
+
+                if behaviour == "ok":
+                    if stub.etag and self.headers.get("If-None-Match") == stub.etag:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                    self.send_header("Content-Length", str(len(stub.workbook)))
+                    if stub.etag:
+                        self.send_header("ETag", stub.etag)
+                    self.end_headers()
+                    self.wfile.write(stub.workbook)
+                elif behaviour == "html":
+                    body = b"<html><body>Sign in to continue</body></html>" * 50
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif behaviour == "fail":
+                    self.send_error(500)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
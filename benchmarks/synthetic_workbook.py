@@ -0,0 +1,256 @@
+# synthetic_workbook.py - Savings_WIP_Data generator with realistic distributions at any size
+#
+# Usage: python benchmarks/synthetic_workbook.py --rows 100000 [--out savings_100k.xlsx] [--seed 0]
+#
+# The frame has the columns, header quirks ("Brand ") and value mix of
+# SCP_Savings_FY26_dummy_v3.xlsx: domain / brand / vendor shares, 12-60 month
+# contracts starting FY24-FY26, lognormal contract values and forecast
+# deltas of a few percent. Excel caps a sheet at 1,048,576 rows, so larger
+# sizes can only be written as Parquet (.parquet out path).
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import workbook
+
+EXCEL_MAX_ROWS = 1_048_576 - 1  # minus the header row
+
+GENERATE_CHUNK_ROWS = 1_000_000
+
+# Domain share of contracts, as in the dummy workbook
+DOMAIN_SHARES = {
+    "Hardware": 0.34,
+    "Software": 0.29,
+    "Database": 0.18,
+    "Storage": 0.15,
+    "DataCenter": 0.025,
+    "Services": 0.015,
+}
+
+# (brand, vendor, product) choices per domain
+CATALOGUE = {
+    "Hardware": [
+        ("Dell", "Dell", "R940 Direct Support"),
+        ("Dell", "Computacenter", "R6515 3rd Party Support"),
+        ("HP", "PivIT Global Inc", "ProLiant DL380 Support"),
+        ("HP Dell", "PivIT", "Mixed Server Estate Support"),
+        ("Cisco", "Singtel Telecommunications Limited", "UCS Chassis SmartNet"),
+    ],
+    "Software": [
+        ("Redhat", "Red Hat Inc", "RHEL Premium Subscription"),
+        ("Elastic", "Shi International", "Elastic Enterprise Subscription"),
+        ("VMware", "Computacenter", "vSphere Enterprise Plus Support"),
+        ("Microsoft", "Shi International", "Enterprise Agreement True-up"),
+    ],
+    "Database": [
+        ("Oracle", "Oracle", "DB XXXX Support"),
+        ("Oracle", "Oracle", "MySQL Enterprise Edition Support"),
+        ("Oracle", "Rimini Street", "DB 3rd Party Support"),
+    ],
+    "Storage": [
+        ("Pure Storage", "PivIT Global Inc", "FlashArray Evergreen Support"),
+        ("Pure Storage", "Pure Storage", "FlashBlade Support"),
+        ("NetApp", "Computacenter", "AFF A400 Support"),
+    ],
+    "DataCenter": [
+        ("Schneider", "Schneider Electric", "UPS Maintenance"),
+        ("Vertiv", "Vertiv", "CRAC Unit Maintenance"),
+    ],
+    "Services": [
+        ("Accenture", "Accenture", "Managed Services Retainer"),
+        ("Kyndryl", "Kyndryl", "Infrastructure Managed Services"),
+    ],
+}
+
+SITES = ["SAC", "SGD", "DUC", "LHR", "SIN"]
+REQUESTOR_SHARES = {"MS": 0.52, "DS": 0.39, "ER": 0.04, "HM": 0.035, "BM": 0.015}
+SUPPORT_MONTHS = {12: 0.6, 24: 0.1, 36: 0.25, 60: 0.05}
+CONTRACT_STARTS = ("2023-04-01", "2026-03-31")
+
+# Column order of the real sheet
+SHEET_COLUMNS = [
+    "Domain", "Forecast ID", "Brand ", "Vendor", "Term Description", "Contract Start", "Contract End",
+    "Support Duration", "Requestor", "Secondary Requestor", "Month for Savings", "Month for Savings(Finance)",
+    "Remaining Months", "Calculation2", "Month-SCP", "FY of Savings-SCP", "Month of Savings-Finance",
+    "FY of Savings-Finance", "Total Contract Amount", "Total Contract Forecast", "Contract Amount (PA)",
+    "Forecast (PA)", "Difference", "Difference (PA)-Finance", "Difference (PA) -SCP", "%", "Monthly", "Column1",
+]
+
+
+def _weighted(rng, shares, rows):
+    labels = list(shares)
+    codes = rng.choice(len(labels), size=rows, p=np.array(list(shares.values())) / sum(shares.values()))
+    return labels, codes
+
+
+def _categorical(labels, codes):
+    """Categorical of ``labels[code]`` per row; ``labels`` may repeat"""
+    categories = sorted(set(labels))
+    lookup = np.array([categories.index(label) for label in labels])
+    return pd.Categorical.from_codes(lookup[codes], categories)
+
+
+def _fiscal_year(dates):
+    """April-to-March fiscal year labels (April 2025 -> FY26)"""
+    years = dates.dt.year + (dates.dt.month >= 4)
+    return "FY" + (years % 100).astype(str).str.zfill(2)
+
+
+def synthetic_savings_frame(rows, seed=0, full_sheet=True):
+    """A ``rows``-row Savings_WIP_Data frame
+
+    With ``full_sheet`` the frame holds every column of the real sheet,
+    working columns and raw headers included. Otherwise it holds only the
+    ingestion schema columns under their clean names, i.e. what
+    ``read_sheet`` returns. Rows are generated in chunks so the temporaries
+    stay small next to the result.
+    """
+    rng = np.random.default_rng(seed)
+    chunks = [
+        _generate_chunk(rng, first, min(GENERATE_CHUNK_ROWS, rows - first), full_sheet)
+        for first in range(0, max(rows, 1), GENERATE_CHUNK_ROWS)
+    ]
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _generate_chunk(rng, first, rows, full_sheet):
+    domains, domain_codes = _weighted(rng, DOMAIN_SHARES, rows)
+    # Pick a catalogue entry within each row's domain
+    flat = [(domain, entry) for domain in domains for entry in CATALOGUE[domain]]
+    offsets = np.cumsum([0] + [len(CATALOGUE[domain]) for domain in domains])
+    sizes = np.diff(offsets)
+    entry_codes = offsets[domain_codes] + (rng.random(rows) * sizes[domain_codes]).astype(np.int64)
+
+    brands = [entry[0] for _, entry in flat]
+    vendors = [entry[1] for _, entry in flat]
+    products = [entry[2] for _, entry in flat]
+
+    start_low, start_high = (pd.Timestamp(value) for value in CONTRACT_STARTS)
+    start = pd.Series(start_low + pd.to_timedelta(rng.integers(0, (start_high - start_low).days + 1, rows), unit="D"))
+    months, month_codes = _weighted(rng, SUPPORT_MONTHS, rows)
+    duration = np.array(months)[month_codes]
+    end = start + pd.to_timedelta(np.round(duration * 30.4375).astype(np.int64) - 1, unit="D")
+
+    # Finance books some savings up to three months before the contract starts
+    finance_lag = rng.choice(4, size=rows, p=[0.8, 0.1, 0.06, 0.04])
+    finance_month = (start.dt.to_period("M") - finance_lag).dt.to_timestamp()
+
+    total_amount = np.round(np.exp(rng.normal(np.log(120_000), 1.0, rows)) * (duration / 12), 2)
+    amount_pa = np.round(total_amount / (duration / 12), 2)
+    forecast_pa = np.round(amount_pa * (1 + rng.normal(0.0, 0.06, rows)), 2)
+    saving_pa = np.round(forecast_pa - amount_pa, 2)
+    # SCP usually books the same saving as Finance; the rest is pro-rated
+    scp_saving = np.where(rng.random(rows) < 0.9, saving_pa, np.round(saving_pa * rng.uniform(0.25, 1.0, rows), 2))
+
+    forecast_ids = "F" + pd.Series(np.arange(3200 + first, 3200 + first + rows)).astype(str)
+    sites = pd.Categorical.from_codes(rng.integers(0, len(SITES), rows), SITES)
+    term = (
+        forecast_ids + "_" + pd.Series(sites).astype(str) + ": "
+        + pd.Series(_categorical(brands, entry_codes)).astype(str) + " "
+        + pd.Series(_categorical(products, entry_codes)).astype(str)
+        + " " + start.dt.year.astype(str)
+    )
+    requestors, requestor_codes = _weighted(rng, REQUESTOR_SHARES, rows)
+
+    df = pd.DataFrame({
+        "Domain": pd.Categorical.from_codes(domain_codes, domains),
+        "Forecast ID": forecast_ids,
+        "Brand ": _categorical(brands, entry_codes),
+        "Vendor": _categorical(vendors, entry_codes),
+        "Term Description": term,
+        "Contract Start": start,
+        "Contract End": end,
+        "Requestor": pd.Categorical.from_codes(requestor_codes, requestors),
+        "FY of Savings-SCP": _fiscal_year(start),
+        "FY of Savings-Finance": _fiscal_year(finance_month),
+        "Contract Amount (PA)": amount_pa,
+        "Forecast (PA)": forecast_pa,
+        "Difference (PA)-Finance": saving_pa,
+        "Difference (PA) -SCP": scp_saving,
+    })
+    if not full_sheet:
+        return df.rename(columns={"Brand ": "Brand"})
+
+    total_forecast = np.round(forecast_pa * (duration / 12), 2)
+    fiscal_month = ((start.dt.month - 4) % 12 + 1).to_numpy()
+    df["Support Duration"] = duration
+    df["Secondary Requestor"] = pd.Categorical.from_codes(rng.integers(0, len(requestors), rows), requestors)
+    df["Month for Savings"] = fiscal_month
+    df["Month for Savings(Finance)"] = ((finance_month.dt.month - 4) % 12 + 1).to_numpy()
+    df["Remaining Months"] = 13 - fiscal_month
+    df["Calculation2"] = np.minimum(duration, 12)
+    df["Month-SCP"] = start.dt.strftime("%b-%y")
+    df["Month of Savings-Finance"] = finance_month.dt.strftime("%b-%y")
+    df["Total Contract Amount"] = total_amount
+    df["Total Contract Forecast"] = total_forecast
+    df["Difference"] = np.round(total_forecast - total_amount, 2)
+    df["%"] = np.round(saving_pa / amount_pa, 6)
+    df["Monthly"] = np.round(saving_pa / 12, 2)
+    df["Column1"] = saving_pa
+    return df[SHEET_COLUMNS]
+
+
+def write_workbook(df, path):
+    """Write ``df`` as the Savings_WIP_Data sheet of an .xlsx (openpyxl write-only mode)"""
+    import openpyxl
+
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df):,} rows do not fit in one Excel sheet ({EXCEL_MAX_ROWS:,} max)")
+    out = openpyxl.Workbook(write_only=True)
+    sheet = out.create_sheet(workbook.SHEET_NAME)
+    sheet.append(list(df.columns))
+    columns = []
+    for name in df.columns:
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            columns.append(column.dt.to_pydatetime().tolist())
+        else:
+            columns.append(column.astype(object).tolist())
+    for row in zip(*columns):
+        sheet.append(row)
+    out.save(path)
+
+
+def cached_workbook(rows, seed=0, directory=None):
+    """Path of a generated ``rows``-row .xlsx in the temp directory, built on first use"""
+    directory = directory or tempfile.gettempdir()
+    path = os.path.join(directory, f"scp_savings_generated_{rows}_{seed}.xlsx")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        write_workbook(synthetic_savings_frame(rows, seed), tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--out", help=".xlsx or .parquet path (default: the temp directory)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.out is None:
+        path = cached_workbook(args.rows, args.seed)
+    elif args.out.endswith(".parquet"):
+        path = args.out
+        synthetic_savings_frame(args.rows, args.seed, full_sheet=args.rows <= EXCEL_MAX_ROWS).to_parquet(path, index=False)
+    else:
+        path = args.out
+        write_workbook(synthetic_savings_frame(args.rows, args.seed), path)
+    print(f"{args.rows:,} rows -> {path} ({os.path.getsize(path) / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# charts.py - Plotly figure builders for the Strategic Analytics section
+
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from timing import span
+
+MCKINSEY_BLUES = ['#001f3f', '#003366', '#004080', '#0066cc', '#3399ff', '#66b3ff', '#99ccff']
+
+# Bump when a builder's layout or styling changes so cached figures are rebuilt
+CHART_THEME = "executive-blues-1"
+
+FIGURE_CACHE_MAX_ENTRIES = 128
+
+# st.plotly_chart serialises through plotly.io.to_json; orjson is several times faster
+if importlib.util.find_spec("orjson") is not None:
+    pio.json.config.default_engine = "orjson"
+
+
+def palette(n):
+    """``n`` bar colours cycling through the house blues"""
+    return [MCKINSEY_BLUES[i % len(MCKINSEY_BLUES)] for i in range(n)]
+
+
+def money_labels(values):
+    """Bar labels formatted like the summary tiles (``$1,234`` / ``$-1,234``)"""
+    return [f"${value:,.0f}" for value in values]
+
+
+def _title(text):
+    return {
+        'text': text,
+        'x': 0.5,
+        'font': {'size': 18, 'color': '#003366', 'family': 'Helvetica Neue'}
+    }
+
+
+def fiscal_year_figure(data, fy_column, value_column, title, yaxis_title):
+    """Vertical bars of ``value_column`` per fiscal year, as a single trace
+
+    Colours, labels and hover text are array-valued on one ``go.Bar``, so
+    building and serialising the figure does not grow a trace per year.
+    """
+    labels = money_labels(data[value_column])
+
+    fig = go.Figure(go.Bar(
+        x=data[fy_column].astype(str).tolist(),
+        y=data[value_column].to_numpy(),
+        marker_color=palette(len(data)),
+        text=labels,
+        textposition="outside",
+        customdata=labels,
+        showlegend=False,
+        hovertemplate="<b>FY:</b> %{x}<br><b>Impact:</b> %{customdata}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=_title(title),
+        xaxis_title="Fiscal Year",
+        yaxis_title=yaxis_title,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(size=11, color="#003366"),
+        height=450,
+        xaxis=dict(showgrid=False, tickangle=0),
+        yaxis=dict(showgrid=True, gridcolor='#f0f0f0', gridwidth=1)
+    )
+    return fig
+
+
+def domain_figure(data):
+    """Horizontal bars of Savings_Finance per business domain"""
+    n_domains = len(data)
+
+    fig = go.Figure(go.Bar(
+        x=data["Savings_Finance"].to_numpy(),
+        y=data["Domain"].astype(str).tolist(),
+        orientation='h',
+        marker=dict(
+            color=palette(n_domains),
+            line=dict(color='white', width=1)
+        ),
+        text=money_labels(data["Savings_Finance"]),
+        textposition="outside",
+        hovertemplate="<b>Domain:</b> %{y}<br><b>Financial Impact:</b> $%{x:,.0f}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=_title("Financial Impact by Business Domain"),
+        xaxis_title="Financial Impact ($)",
+        yaxis_title="Business Domain",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(size=11, color="#003366"),
+        height=max(400, n_domains * 45),
+        showlegend=False,
+        xaxis=dict(showgrid=True, gridcolor='#f0f0f0', gridwidth=1),
+        yaxis=dict(showgrid=False)
+    )
+    return fig
+
+
+def series_key(data):
+    """Content hash of an aggregated series frame"""
+    digest = hashlib.sha1(repr(list(data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Process-wide LRU of built figures keyed by chart, series content and theme
+
+    A figure whose aggregated data did not change is handed back as is,
+    skipping plotly's property validation.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with span("figure build"):
+            fig = build()
+        with self._lock:
+            self._entries[key] = fig
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+figure_cache = FigureCache()
+
+
+def cached_fiscal_year_figure(data, fy_column, value_column, title, yaxis_title):
+    """``fiscal_year_figure`` through the figure cache"""
+    key = ("fiscal_year", fy_column, value_column, title, yaxis_title, CHART_THEME, series_key(data))
+    return figure_cache.get_or_build(
+        key, lambda: fiscal_year_figure(data, fy_column, value_column, title, yaxis_title)
+    )
+
+
+def cached_domain_figure(data):
+    """``domain_figure`` through the figure cache"""
+    key = ("domain", CHART_THEME, series_key(data))
+    return figure_cache.get_or_build(key, lambda: domain_figure(data))
@@ -0,0 +1,138 @@
+# dataset.py - Canonical, read-only savings dataset shared by every session
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from analytics import FilterIndex, SavingsCube, measure_arrays
+from engines import build_engine
+from timing import span
+from workbook import DATE_COLUMNS, INGEST_SCHEMA, RENAMED_COLUMNS
+
+# Store low-cardinality text as category and downcast numbers where lossless
+COMPACT_MODE = os.environ.get("SCP_COMPACT", "1") not in ("0", "false", "no")
+
+# A dimension becomes categorical when its distinct values are at most this share of the rows
+CATEGORY_MAX_RATIO = 0.5
+
+# Derived frames must never write through to the shared canonical frame.
+# pandas >= 3 always behaves this way; older versions need Copy-on-Write switched on.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+FILTER_DIMENSIONS = ["FY of Savings-Finance", "FY of Savings-SCP", "Domain"]
+
+
+class SavingsDataset:
+    """One cleaned version of the savings table plus what the filter widgets need
+
+    Built once per source version by ``build_dataset`` and then shared
+    read-only across reruns and sessions, so a rerun never re-cleans or
+    copies the whole frame. ``version`` identifies the contents and is the
+    key for anything derived from it; ``source`` names the workbook it was
+    built from (its snapshot key), when known.
+    """
+
+    def __init__(self, df, version, memory_before=None, engine=None, source=None):
+        self.df = df
+        self.version = version
+        self.source = source
+        self.memory_after = frame_memory(df)
+        self.memory_before = memory_before if memory_before is not None else self.memory_after
+        self.row_count = len(df)
+        self.options = {
+            column: sorted(df[column].dropna().unique().tolist())
+            for column in FILTER_DIMENSIONS
+            if column in df.columns
+        }
+        self.date_bounds = {}
+        for column in DATE_COLUMNS:
+            if column in df.columns:
+                self.date_bounds[column] = (df[column].min(), df[column].max())
+        self.filter_index = FilterIndex(df)
+        self.measures, self.domain_codes, self.domain_count = measure_arrays(df)
+        # With an optional engine (SCP_QUERY_ENGINE) it answers every selection and no cube is needed
+        self.engine = build_engine(df, self.measures, engine)
+        self.cube = SavingsCube(df, self.filter_index, self.default_window()) if self.engine is None else None
+
+    def default_window(self):
+        """(start, end) contract dates the filter widgets start from; None where there is no widget"""
+        window = []
+        for column, pick in (("Contract Start", 0), ("Contract End", 1)):
+            bounds = self.date_bounds.get(column)
+            if bounds is None or pd.isna(bounds[0]) or pd.isna(bounds[1]):
+                window.append(None)
+            else:
+                window.append(bounds[pick].date())
+        return tuple(window)
+
+    def __repr__(self):
+        return f"SavingsDataset(version={self.version!r}, rows={self.row_count})"
+
+
+def frame_memory(df):
+    """Deep in-memory size of a frame in bytes"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def format_bytes(size):
+    """Render a byte count like ``512 B``, ``14.2 KB`` or ``3.1 MB``"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def compact_frame(df):
+    """Return ``df`` with categorical dimensions and losslessly downcast numbers
+
+    Text dimensions from the ingestion schema with few distinct values
+    (Domain, Vendor, Brand, Requestor, the FY columns) become ``category``.
+    Integer columns are downcast to the smallest type that holds them;
+    float columns only become float32 when every value round-trips exactly.
+    """
+    dimensions = [RENAMED_COLUMNS.get(name, name) for name, kind in INGEST_SCHEMA.items() if kind == "dimension"]
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if column in dimensions and not isinstance(series.dtype, pd.CategoricalDtype):
+            if len(series) and series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+                series = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            series = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            narrowed = series.astype(np.float32)
+            if np.array_equal(narrowed.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+                series = narrowed
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def dataset_version(df):
+    """Stable content hash of a frame (columns, dtypes and values)"""
+    digest = hashlib.sha256()
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def build_dataset(df, compact=None, engine=None):
+    """Canonicalise a preprocessed frame into a ``SavingsDataset`` (or None)
+
+    ``df`` comes from ``read_savings_workbook`` (or its snapshot, or the
+    lake), which already ran ``preprocess_savings_data``. ``compact`` and
+    ``engine`` override ``SCP_COMPACT`` and ``SCP_QUERY_ENGINE``.
+    """
+    if df is None:
+        return None
+    source = df.attrs.get("source")
+    with span("build dataset", rows=len(df)) as built:
+        df = df.reset_index(drop=True)
+        memory_before = frame_memory(df)
+        if COMPACT_MODE if compact is None else compact:
+            df = compact_frame(df)
+        dataset = SavingsDataset(df, dataset_version(df), memory_before=memory_before, engine=engine, source=source)
+        built.bytes = dataset.memory_after
+    return dataset
@@ -0,0 +1,293 @@
+# engines.py - Optional query engines answering dashboard filters instead of the pandas index
+
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from analytics import DIMENSION_FILTERS, MEASURES
+from timing import span
+
+# "pandas" keeps the bitmap index and cube; any other name from QUERY_ENGINES
+# answers every filter selection with that engine
+QUERY_ENGINE = os.environ.get("SCP_QUERY_ENGINE", "pandas")
+
+DATE_FILTERS = {
+    "start_date": ("Contract Start", ">="),
+    "end_date": ("Contract End", "<="),
+}
+
+# The chart series keys and the column each one groups by
+SERIES_GROUPS = {
+    "finance_by_fy": ("FY of Savings-Finance", "Savings_Finance"),
+    "scp_by_fy": ("FY of Savings-SCP", "Savings_SCP"),
+    "finance_by_domain": ("Domain", "Savings_Finance"),
+}
+
+
+class QueryEngine:
+    """Row ids, filter columns and measures of one dataset version, queried per ``FilterSpec``
+
+    Subclasses load ``table`` into their engine and implement ``select``
+    (matching row positions, ascending) and ``aggregate`` (summary and
+    chart series in the shape of the pandas path).
+    """
+
+    name = None
+
+    def __init__(self, df, measures):
+        self.columns = set(df.columns)
+        self.row_count = len(df)
+        self.dimensions = [column for column in DIMENSION_FILTERS.values() if column in self.columns]
+        self.dates = [column for column, _ in DATE_FILTERS.values() if column in self.columns]
+        # Grouping columns of the chart series, each once
+        self.groups = [column for column in dict.fromkeys(column for column, _ in SERIES_GROUPS.values()) if column in self.columns]
+
+        arrays = {"row_id": pa.array(np.arange(len(df), dtype=np.int64))}
+        for column in self.dimensions:
+            array = pa.array(df[column], from_pandas=True)
+            if pa.types.is_dictionary(array.type):
+                array = array.dictionary_decode()
+            arrays[column] = array
+        for column in self.dates:
+            arrays[column] = pa.array(df[column], from_pandas=True)
+        # The float64 measure matrix the pandas KPI kernel reads, so every engine sums the same values
+        for column, values in zip(MEASURES, measures):
+            arrays[column] = pa.array(values)
+        self.table = pa.table(arrays)
+
+    def filters(self, spec):
+        """``(column, operator, value)`` conditions of ``spec`` on the columns present"""
+        conditions = []
+        for field, (column, operator) in DATE_FILTERS.items():
+            value = getattr(spec, field)
+            if value and column in self.columns:
+                conditions.append((column, operator, pd.Timestamp(value).to_pydatetime()))
+        for field, column in DIMENSION_FILTERS.items():
+            value = getattr(spec, field)
+            if value is not None and column in self.columns:
+                conditions.append((column, "=", value))
+        return conditions
+
+    def summary(self, count, net, gains, risks):
+        """The summary dict from per-measure totals (Savings_Finance, Savings_SCP)"""
+        net = np.asarray(net, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = net / count
+        return {
+            "total_finance": net[0],
+            "gains_finance": np.float64(gains[0]),
+            "risks_finance": np.float64(risks[0]),
+            "total_scp": net[1],
+            "gains_scp": np.float64(gains[1]),
+            "risks_scp": np.float64(risks[1]),
+            "count": int(count),
+            "avg_finance": mean[0],
+            "avg_scp": mean[1],
+            "domains": None,
+        }
+
+    def series(self, groups):
+        """Chart series from ``{column: (labels, finance sums, scp sums)}`` of non-missing groups"""
+        series = dict.fromkeys(SERIES_GROUPS)
+        for key, (column, measure) in SERIES_GROUPS.items():
+            if column not in groups:
+                continue
+            labels, finance, scp = groups[column]
+            values = finance if measure == "Savings_Finance" else scp
+            data = pd.DataFrame({column: list(labels), measure: np.asarray(values, dtype=np.float64)})
+            data = data.sort_values(column).reset_index(drop=True)
+            if key == "finance_by_domain":
+                data = data.sort_values(measure, ascending=True)
+            series[key] = data
+        return series
+
+    def query(self, spec):
+        """``(rows, summary, series)`` for ``spec``"""
+        with span("filter", rows=self.row_count):
+            rows = self.select(spec)
+        with span("aggregate", rows=len(rows)):
+            summary, series = self.aggregate(spec)
+        if "Domain" in self.columns:
+            # Groups only exist for domains with rows, so no distinct count is needed
+            summary["domains"] = len(series["finance_by_domain"])
+        return rows, summary, series
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _measure_sums(column, alias):
+    quoted = _quote(column)
+    return (
+        f"coalesce(sum({quoted}), 0) AS {alias}_net, "
+        f"coalesce(sum(greatest({quoted}, 0)), 0) AS {alias}_gains, "
+        f"coalesce(sum(least({quoted}, 0)), 0) AS {alias}_risks"
+    )
+
+
+class DuckDBEngine(QueryEngine):
+    """The dataset in an in-process DuckDB table
+
+    A selection is answered with two SQL queries: the matching row ids
+    (for the Portfolio table and exports) and one ``GROUPING SETS``
+    aggregate that returns the KPIs and all three chart series together.
+    DuckDB runs both multi-threaded, and only the small grouped result
+    comes back into pandas. Each query runs on its own cursor, so
+    sessions can query concurrently.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, df, measures):
+        import duckdb
+
+        super().__init__(df, measures)
+        self._connection = duckdb.connect(":memory:")
+        self._connection.register("source", self.table)
+        self._connection.execute("CREATE TABLE savings AS SELECT * FROM source ORDER BY row_id")
+        self._connection.unregister("source")
+        del self.table
+
+    def _where(self, spec):
+        conditions = self.filters(spec)
+        where = " AND ".join(f"{_quote(column)} {operator} ?" for column, operator, _ in conditions)
+        return where or "TRUE", [value for _, _, value in conditions]
+
+    def _execute(self, sql, parameters):
+        cursor = self._connection.cursor()
+        try:
+            return cursor.execute(sql, parameters).fetchdf()
+        finally:
+            cursor.close()
+
+    def select(self, spec):
+        where, parameters = self._where(spec)
+        # The table is stored in row_id order and DuckDB preserves insertion order, so no ORDER BY
+        rows = self._execute(f"SELECT row_id FROM savings WHERE {where}", parameters)
+        return rows["row_id"].to_numpy(dtype=np.intp)
+
+    def aggregate(self, spec):
+        where, parameters = self._where(spec)
+        grouping_sets = ", ".join(["()"] + [f"({_quote(column)})" for column in self.groups])
+        keys = "".join(f"{_quote(column)}, grouping({_quote(column)}) AS grouped_{i}, " for i, column in enumerate(self.groups))
+        result = self._execute(
+            f"SELECT {keys}count(*) AS count, "
+            f"{_measure_sums('Savings_Finance', 'finance')}, {_measure_sums('Savings_SCP', 'scp')} "
+            f"FROM savings WHERE {where} GROUP BY GROUPING SETS ({grouping_sets})",
+            parameters,
+        )
+
+        # grouping(column) is 1 on the rows that are not grouped by that column,
+        # so the grand total is the one row where every flag is 1
+        not_grouped = [result[f"grouped_{i}"].to_numpy() == 1 for i in range(len(self.groups))]
+        total = (result[np.logical_and.reduce(not_grouped)] if self.groups else result).iloc[0]
+        summary = self.summary(
+            total["count"],
+            [total["finance_net"], total["scp_net"]],
+            [total["finance_gains"], total["scp_gains"]],
+            [total["finance_risks"], total["scp_risks"]],
+        )
+
+        groups = {}
+        for i, column in enumerate(self.groups):
+            # Like groupby(observed=True): this grouping set's rows with a non-missing key
+            rows = result[~not_grouped[i] & result[column].notna().to_numpy()]
+            groups[column] = (rows[column].tolist(), rows["finance_net"], rows["scp_net"])
+        return summary, self.series(groups)
+
+
+class PolarsEngine(QueryEngine):
+    """The dataset as a Polars frame, queried through lazy plans
+
+    Each selection builds one ``LazyFrame`` plan per output: the row ids,
+    the KPI totals and one group-by per chart. The filter predicates and
+    the column projection are pushed down into the frame scan, the plans
+    run together on Polars' thread pool with the shared filtered scan
+    computed once, and only the grouped outputs are collected.
+    """
+
+    name = "polars"
+
+    def __init__(self, df, measures):
+        import polars as pl
+
+        super().__init__(df, measures)
+        self._pl = pl
+        frame = pl.from_arrow(self.table)
+        del self.table
+        # Group-bys and equality filters on categoricals skip the string hashing
+        text = [column for column in self.dimensions if frame.schema[column] == pl.String]
+        self._frame = frame.with_columns(pl.col(text).cast(pl.Categorical))
+
+    def _filtered(self, spec):
+        pl = self._pl
+        predicates = []
+        for column, operator, value in self.filters(spec):
+            if operator == ">=":
+                predicates.append(pl.col(column) >= value)
+            elif operator == "<=":
+                predicates.append(pl.col(column) <= value)
+            else:
+                predicates.append(pl.col(column) == value)
+        frame = self._frame.lazy()
+        return frame.filter(pl.all_horizontal(predicates)) if predicates else frame
+
+    def select(self, spec):
+        rows = self._filtered(spec).select("row_id").collect()
+        return rows["row_id"].to_numpy().astype(np.intp)
+
+    def aggregate(self, spec):
+        pl = self._pl
+        filtered = self._filtered(spec)
+        totals = [pl.len().alias("count")]
+        for column in MEASURES:
+            totals += [
+                pl.col(column).sum().alias(f"{column}_net"),
+                pl.col(column).clip(lower_bound=0).sum().alias(f"{column}_gains"),
+                pl.col(column).clip(upper_bound=0).sum().alias(f"{column}_risks"),
+            ]
+        plans = [filtered.select(totals)] + [
+            filtered.drop_nulls(column).group_by(column).agg(pl.col(MEASURES).sum())
+            for column in self.groups
+        ]
+        total, *grouped = pl.collect_all(plans)
+
+        total = total.row(0, named=True)
+        summary = self.summary(
+            total["count"],
+            [total[f"{column}_net"] for column in MEASURES],
+            [total[f"{column}_gains"] for column in MEASURES],
+            [total[f"{column}_risks"] for column in MEASURES],
+        )
+        groups = {
+            column: (data[column].to_list(), data["Savings_Finance"].to_numpy(), data["Savings_SCP"].to_numpy())
+            for column, data in zip(self.groups, grouped)
+        }
+        return summary, self.series(groups)
+
+
+# Each entry is (name, required module, engine class)
+QUERY_ENGINES = [
+    ("duckdb", "duckdb", DuckDBEngine),
+    ("polars", "polars", PolarsEngine),
+]
+
+
+def available_engines():
+    """``pandas`` plus every optional engine whose dependency is installed"""
+    return ["pandas"] + [name for name, module, _ in QUERY_ENGINES if importlib.util.find_spec(module) is not None]
+
+
+def build_engine(df, measures, engine=None):
+    """The optional engine named by ``engine`` (default ``SCP_QUERY_ENGINE``) for a frame; None for pandas"""
+    engine = engine or QUERY_ENGINE
+    if engine == "pandas":
+        return None
+    engines = {name: engine_class for name, _, engine_class in QUERY_ENGINES}
+    if engine not in engines:
+        raise ValueError(f"unknown query engine {engine!r}; expected one of {', '.join(['pandas'] + list(engines))}")
+    return engines[engine](df, measures)
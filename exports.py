@@ -0,0 +1,195 @@
+# exports.py - Data Export payloads, built on demand and cached per filter selection
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from timing import span
+
+EXPORT_CACHE_MAX_BYTES = int(float(os.environ.get("SCP_EXPORT_CACHE_MB", "128")) * 1024 * 1024)
+
+# Rows serialised per chunk, so a large export never exists as one giant string
+EXPORT_CHUNK_ROWS = 50_000
+
+# (label, summary key, shown as a magnitude)
+SUMMARY_METRICS = [
+    ("Net Finance Impact", "total_finance", False),
+    ("Finance Upside", "gains_finance", False),
+    ("Finance Exposure", "risks_finance", True),
+    ("Net SCP Impact", "total_scp", False),
+    ("SCP Upside", "gains_scp", False),
+    ("SCP Exposure", "risks_scp", True),
+]
+
+
+def summary_frame(summary):
+    """The Executive Summary tiles as a Metric / Value table"""
+    return pd.DataFrame({
+        "Metric": [label for label, _, _ in SUMMARY_METRICS],
+        "Value": [abs(summary[key]) if magnitude else summary[key] for _, key, magnitude in SUMMARY_METRICS],
+    })
+
+
+def iter_row_chunks(dataset, rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the selected rows of the canonical frame ``chunk_rows`` at a time"""
+    if len(rows) == 0:
+        yield dataset.df.iloc[:0]
+        return
+    for start in range(0, len(rows), chunk_rows):
+        yield dataset.df.take(rows[start:start + chunk_rows])
+
+
+def write_csv(chunks, target):
+    """Write frame ``chunks`` to the binary file ``target`` as one UTF-8 CSV"""
+    header = True
+    for chunk in chunks:
+        target.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+
+
+def compressed_csv_writer(codec):
+    """``write_csv`` through a gzip / zstd stream"""
+    def write(chunks, target):
+        with pa.CompressedOutputStream(target, codec) as stream:
+            write_csv(chunks, stream)
+    return write
+
+
+def _arrow_tables(chunks):
+    """Arrow tables for ``chunks``, all in the schema of the first one
+
+    A text column that is entirely missing in the first chunk infers as
+    ``null``; it is widened to string so later chunks still fit.
+    """
+    schema = None
+    for chunk in chunks:
+        if schema is None:
+            inferred = pa.Schema.from_pandas(chunk, preserve_index=False)
+            schema = pa.schema(
+                [field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in inferred],
+                metadata=inferred.metadata,
+            )
+        yield pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def write_parquet(chunks, target):
+    """One Parquet row group per chunk"""
+    writer = None
+    for table in _arrow_tables(chunks):
+        if writer is None:
+            writer = pq.ParquetWriter(target, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def write_feather(chunks, target):
+    """Feather v2 (the Arrow IPC file format), LZ4-compressed like ``pyarrow.feather``"""
+    options = pa.ipc.IpcWriteOptions(compression="lz4" if pa.Codec.is_available("lz4") else None)
+    writer = None
+    for table in _arrow_tables(chunks):
+        if writer is None:
+            writer = pa.ipc.new_file(target, table.schema, options=options)
+        writer.write_table(table)
+    writer.close()
+
+
+ExportFormat = namedtuple("ExportFormat", ["extension", "mime", "write", "codec"])
+
+# Portfolio Data formats, in the order the selectbox lists them
+EXPORT_FORMATS = {
+    "CSV": ExportFormat(".csv", "text/csv", write_csv, None),
+    "CSV (gzip)": ExportFormat(".csv.gz", "application/gzip", compressed_csv_writer("gzip"), "gzip"),
+    "CSV (zstd)": ExportFormat(".csv.zst", "application/zstd", compressed_csv_writer("zstd"), "zstd"),
+    "Parquet": ExportFormat(".parquet", "application/vnd.apache.parquet", write_parquet, None),
+    "Feather": ExportFormat(".feather", "application/vnd.apache.arrow.file", write_feather, None),
+}
+
+
+def available_formats():
+    """Names of the export formats whose compression codec this pyarrow build has"""
+    return [name for name, fmt in EXPORT_FORMATS.items() if fmt.codec is None or pa.Codec.is_available(fmt.codec)]
+
+
+class ExportCache:
+    """Process-wide LRU of built export payloads keyed by (dataset version, filters, format)
+
+    Bounded by the bytes held; a payload larger than the whole budget is
+    handed out but not kept.
+    """
+
+    def __init__(self, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            self.misses += 1
+
+        payload = build()
+        if len(payload) > self.max_bytes:
+            return payload
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = payload
+                self.bytes += len(payload)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+        return payload
+
+    def peek(self, key):
+        """The cached payload for ``key`` or None, without touching LRU order or counters"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self.bytes}
+
+
+export_cache = ExportCache()
+
+
+def summary_csv(dataset, spec, summary):
+    """Executive Summary CSV for one filter selection"""
+    return export_cache.get_or_build(
+        (dataset.version, spec, "summary.csv"),
+        lambda: summary_frame(summary).to_csv(index=False).encode("utf-8"),
+    )
+
+
+def portfolio_export(dataset, spec, rows, format_name="CSV"):
+    """Filtered portfolio rows as ``format_name`` for one filter selection, written in row chunks"""
+    def build():
+        with span(f"export ({format_name})", rows=len(rows)) as exported:
+            sink = pa.BufferOutputStream()
+            EXPORT_FORMATS[format_name].write(iter_row_chunks(dataset, rows), sink)
+            payload = sink.getvalue().to_pybytes()
+            exported.bytes = len(payload)
+        return payload
+
+    return export_cache.get_or_build((dataset.version, spec, format_name), build)
+
+
+def export_size(dataset, spec, format_name):
+    """Size in bytes of an already built portfolio export, or None"""
+    payload = export_cache.peek((dataset.version, spec, format_name))
+    return len(payload) if payload is not None else None
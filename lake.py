@@ -0,0 +1,216 @@
+# lake.py - Hive-partitioned Parquet history of savings workbooks and its pruned read path
+#
+# Usage: python lake.py [--lake savings_lake] WORKBOOK [WORKBOOK ...]
+#
+# Each workbook's Savings_WIP_Data sheet is parsed, preprocessed and written
+# under <lake>/FY of Savings-Finance=<FY>/Domain=<domain>/<workbook>-<key>-<n>.parquet,
+# where <key> hashes the workbook's absolute path. Re-ingesting a workbook from
+# the same path replaces only its own files. Point SCP_LAKE_DIR at
+# the lake to have the dashboard read it instead of OneDrive.
+
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from dataset import build_dataset
+from timing import span
+from workbook import INGEST_SCHEMA, RENAMED_COLUMNS, read_savings_workbook
+
+# Empty keeps the dashboard on OneDrive
+LAKE_DIR = os.environ.get("SCP_LAKE_DIR", "")
+
+PARTITION_COLUMNS = ["FY of Savings-Finance", "Domain"]
+
+# Rows are sorted by Contract Start within a file, so small row groups let
+# start-date filters skip most of a partition on its min/max statistics
+LAKE_ROW_GROUP_ROWS = int(os.environ.get("SCP_LAKE_ROW_GROUP_ROWS", "16384"))
+
+# Pruned datasets kept per lake, one per partition / date selection
+LAKE_CACHE_ENTRIES = int(os.environ.get("SCP_LAKE_CACHE_ENTRIES", "4"))
+
+COLUMN_TYPES = {
+    "dimension": pa.string(),
+    "date": pa.timestamp("us"),
+    "amount": pa.float64(),
+    "measure": pa.float64(),
+    "count": pa.int64(),
+}
+
+# Every workbook is written in this schema, so files from different years always unify
+LAKE_SCHEMA = pa.schema([
+    (RENAMED_COLUMNS.get(name, name), COLUMN_TYPES[kind]) for name, kind in INGEST_SCHEMA.items()
+])
+
+PARTITIONING = ds.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor="hive")
+
+
+def _file_prefix(path):
+    """``<stem>-<path hash>-``: readable, and unique per source workbook path"""
+    key = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:12]
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{key}-"
+
+
+def ingest_workbook(path, lake_dir):
+    """Write one workbook into the lake, replacing its earlier files; returns (rows, files written)"""
+    df = read_savings_workbook(path)
+    prefix = _file_prefix(path)
+    own_file = re.compile(re.escape(prefix) + r"\d+\.parquet")
+    for directory, _, names in os.walk(lake_dir):
+        for name in names:
+            if own_file.fullmatch(name):
+                os.remove(os.path.join(directory, name))
+
+    df = df.sort_values("Contract Start", kind="stable") if "Contract Start" in df.columns else df
+    schema = pa.schema([
+        LAKE_SCHEMA.field(column) if column in LAKE_SCHEMA.names else pa.field(column, pa.string())
+        for column in df.columns
+    ])
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False).replace_schema_metadata(None)
+
+    written = []
+    with span("lake write", rows=len(df)):
+        ds.write_dataset(
+            table,
+            lake_dir,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=prefix + "{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            min_rows_per_group=min(LAKE_ROW_GROUP_ROWS, max(len(df), 1)),
+            max_rows_per_group=LAKE_ROW_GROUP_ROWS,
+            file_visitor=lambda written_file: written.append(written_file.path),
+        )
+    return len(df), len(written)
+
+
+def lake_signature(lake_dir):
+    """Hash of the lake's file names, sizes and modification times"""
+    digest = hashlib.sha256()
+    for directory, _, names in sorted(os.walk(lake_dir)):
+        for name in sorted(names):
+            if name.endswith(".parquet"):
+                stat = os.stat(os.path.join(directory, name))
+                digest.update(f"{os.path.relpath(os.path.join(directory, name), lake_dir)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+class SavingsLake:
+    """The partitions of a lake, and a ``SavingsDataset`` per filter selection
+
+    Opening a lake reads only directory names and Parquet footers: the
+    partition values give the Finance FY and Domain options, and the
+    row-group statistics give the contract date bounds. ``dataset`` then
+    reads just the partitions a selection's Finance FY / Domain touch,
+    skipping row groups whose Contract Start / End statistics fall outside
+    its dates. It exposes ``options`` and ``date_bounds`` like a
+    ``SavingsDataset`` so the filter widgets work on either.
+    """
+
+    def __init__(self, lake_dir, signature=None):
+        self.lake_dir = lake_dir
+        self.signature = signature or lake_signature(lake_dir)
+        # The directory only appears with the first ingest; until then the lake is empty
+        exists = os.path.isdir(lake_dir)
+        fragments = []
+        if exists:
+            fragments = list(ds.dataset(lake_dir, format="parquet", partitioning=PARTITIONING).get_fragments())
+        self.file_count = len(fragments)
+        schema = pa.unify_schemas(
+            [LAKE_SCHEMA] + [fragment.physical_schema for fragment in fragments] + [PARTITIONING.schema],
+            promote_options="permissive",
+        )
+        self._dataset = ds.dataset(lake_dir if exists else [], schema=schema, format="parquet", partitioning=PARTITIONING)
+        self.columns = [name for name in LAKE_SCHEMA.names if name in schema.names]
+        self.columns += [name for name in schema.names if name not in self.columns]
+
+        self.options = {column: set() for column in PARTITION_COLUMNS}
+        self.row_count = 0
+        bounds = {}
+        for fragment in fragments:
+            for column, value in ds.get_partition_keys(fragment.partition_expression).items():
+                if value is not None:
+                    self.options[column].add(value)
+            for row_group in fragment.row_groups:
+                self.row_count += row_group.num_rows
+                for column in ("Contract Start", "Contract End"):
+                    statistics = row_group.statistics.get(column)
+                    if statistics and statistics.get("min") is not None:
+                        low, high = bounds.get(column, (statistics["min"], statistics["max"]))
+                        bounds[column] = (min(low, statistics["min"]), max(high, statistics["max"]))
+        self.options = {column: sorted(values) for column, values in self.options.items() if values}
+        if "FY of Savings-SCP" in schema.names and self.file_count:
+            # Not a partition key: one projected column read
+            scp_years = self._dataset.to_table(columns=["FY of Savings-SCP"]).column(0).unique().drop_null()
+            self.options["FY of Savings-SCP"] = sorted(scp_years.to_pylist())
+        self.date_bounds = {column: (pd.Timestamp(low), pd.Timestamp(high)) for column, (low, high) in bounds.items()}
+
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def expression(self, spec):
+        """Dataset filter for the partition keys and contract dates of ``spec`` (None for all rows)"""
+        conditions = []
+        if spec.finance_fy is not None:
+            conditions.append(ds.field("FY of Savings-Finance") == spec.finance_fy)
+        if spec.domain is not None:
+            conditions.append(ds.field("Domain") == spec.domain)
+        if spec.start_date and "Contract Start" in self.columns:
+            conditions.append(ds.field("Contract Start") >= pa.scalar(pd.Timestamp(spec.start_date), pa.timestamp("us")))
+        if spec.end_date and "Contract End" in self.columns:
+            conditions.append(ds.field("Contract End") <= pa.scalar(pd.Timestamp(spec.end_date), pa.timestamp("us")))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def read(self, spec):
+        """The rows ``spec`` can match, as a frame in the lake's column order"""
+        with span("lake read") as read:
+            table = self._dataset.to_table(filter=self.expression(spec))
+            read.rows, read.bytes = table.num_rows, table.nbytes
+        return table.to_pandas()[self.columns]
+
+    def dataset(self, spec):
+        """``SavingsDataset`` of the partitions and row groups ``spec`` touches, cached per selection"""
+        key = (spec.finance_fy, spec.domain, spec.start_date or None, spec.end_date or None)
+        with self._lock:
+            if key in self._datasets:
+                self._datasets.move_to_end(key)
+                return self._datasets[key]
+        dataset = build_dataset(self.read(spec))
+        with self._lock:
+            self._datasets[key] = dataset
+            while len(self._datasets) > LAKE_CACHE_ENTRIES:
+                self._datasets.popitem(last=False)
+        return dataset
+
+    def describe(self):
+        years = self.options.get("FY of Savings-Finance", [])
+        span_text = f", {years[0]}–{years[-1]}" if years else ""
+        return f"{self.row_count:,} rows in {self.file_count:,} files{span_text}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest savings workbooks into the Parquet lake")
+    parser.add_argument("workbooks", nargs="+")
+    parser.add_argument("--lake", default=LAKE_DIR or "savings_lake")
+    args = parser.parse_args()
+
+    os.makedirs(args.lake, exist_ok=True)
+    for path in args.workbooks:
+        start = time.perf_counter()
+        rows, files = ingest_workbook(path, args.lake)
+        print(f"{path}: {rows:,} rows -> {files} files ({time.perf_counter() - start:.1f}s)")
+    print(f"{args.lake}: {SavingsLake(args.lake).describe()}")
+
+
+if __name__ == "__main__":
+    main()
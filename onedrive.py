@@ -0,0 +1,298 @@
+# onedrive.py - OneDrive workbook fetching helpers for the SCP Savings Dashboard
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import transport
+from timing import span
+
+# "race" fires every download strategy at once; "sequential" tries them in order
+FETCH_MODE = os.environ.get("SCP_FETCH_MODE", "race")
+FETCH_TIMEOUT_SECONDS = 30
+
+# Downloads larger than this are aborted; past SPOOL_MAX_BYTES they go to a temp file
+MAX_WORKBOOK_BYTES = int(float(os.environ.get("SCP_MAX_WORKBOOK_MB", "100")) * 1024 * 1024)
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+MIN_WORKBOOK_BYTES = 1000
+
+# .xlsx files are ZIP archives
+XLSX_MAGIC = b"PK\x03\x04"
+
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+XLSX_ACCEPT = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet,*/*'
+
+
+class RevalidationCache:
+    """Remember the validators and parsed frame of the last good fetch per URL
+
+    Lives at module level for the whole process, so a reload only costs a
+    conditional GET when the workbook has not changed.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            return self._entries.get(url)
+
+    def store(self, url, response, df):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # Nothing to revalidate against - don't hold on to the frame
+            return
+        with self._lock:
+            self._entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "df": df,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+revalidation_cache = RevalidationCache()
+
+
+def conditional_headers(url, headers):
+    """Add If-None-Match / If-Modified-Since for a URL we have fetched before"""
+    request_headers = dict(headers or {})
+    entry = revalidation_cache.get(url)
+    if entry is not None:
+        if entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+    return request_headers
+
+
+# Robust OneDrive file configuration
+def convert_onedrive_to_direct_download(onedrive_url):
+    """Convert OneDrive sharing URL to direct download URL"""
+    try:
+        if "onedrive.live.com" in onedrive_url:
+            # For onedrive.live.com URLs, we need to modify the URL structure
+            if "redir?resid=" in onedrive_url:
+                # Handle redirect-style URLs
+                return onedrive_url.replace("redir?resid=", "download?resid=")
+            elif "?e=" in onedrive_url:
+                # Add download parameter to existing URL
+                return onedrive_url.replace("?e=", "?download=1&e=")
+            else:
+                # Add download parameter
+                separator = "&" if "?" in onedrive_url else "?"
+                return f"{onedrive_url}{separator}download=1"
+        elif "1drv.ms" in onedrive_url:
+            separator = "&" if "?" in onedrive_url else "?"
+            return f"{onedrive_url}{separator}download=1"
+        return onedrive_url
+    except:
+        return onedrive_url
+
+
+def download_candidates(onedrive_url):
+    """Download strategies for a sharing URL, in order of preference
+
+    Each candidate is a dict with the ``url`` to fetch, the request
+    ``headers`` and the ``message`` reported when it wins.
+    """
+    candidates = []
+
+    # Method 1: OneDrive API direct download link built from the resource ID
+    resid_match = re.search(r'resid=([^&]+)', onedrive_url)
+    if resid_match:
+        resource_id = resid_match.group(1)
+        candidates.append({
+            "name": "api",
+            "url": f"https://api.onedrive.com/v1.0/shares/{resource_id}/root/content",
+            "headers": {
+                'User-Agent': BROWSER_USER_AGENT,
+                'Accept': XLSX_ACCEPT,
+            },
+            "message": "OneDrive file loaded successfully via API",
+        })
+
+    # Method 2: Direct download conversion
+    browser_headers = {
+        'User-Agent': BROWSER_USER_AGENT,
+        'Accept': XLSX_ACCEPT,
+        'Accept-Language': 'en-US,en;q=0.9',
+    }
+    candidates.append({
+        "name": "direct",
+        "url": convert_onedrive_to_direct_download(onedrive_url),
+        "headers": browser_headers,
+        "message": "OneDrive file loaded successfully",
+    })
+
+    # Method 3: Remove specific parameters that might interfere
+    clean_url = onedrive_url.split('&redeem=')[0] if '&redeem=' in onedrive_url else onedrive_url
+    clean_url = clean_url.split('&migratedtospo=')[0] if '&migratedtospo=' in clean_url else clean_url
+    if clean_url != onedrive_url:
+        candidates.append({
+            "name": "cleaned",
+            "url": clean_url,
+            "headers": browser_headers,
+            "message": "OneDrive file loaded with cleaned URL",
+        })
+
+    return candidates
+
+
+class WorkbookRejected(Exception):
+    """The response is not a workbook we are willing to parse"""
+
+
+def stream_workbook(response, max_bytes=MAX_WORKBOOK_BYTES, cancel=None):
+    """Stream a response body into a spooled temp file, hashing it on the way
+
+    Checks the ZIP magic bytes on the first chunk so HTML login or error
+    pages are dropped before the rest of the body is read. Returns the
+    rewound file object and its SHA-256 hex digest; raises
+    ``WorkbookRejected`` otherwise.
+    """
+    declared_length = response.headers.get("Content-Length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        raise WorkbookRejected(f"workbook is {int(declared_length):,} bytes, limit is {max_bytes:,}")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if not chunk:
+                continue
+            if cancel is not None and cancel.is_set():
+                raise WorkbookRejected("download cancelled")
+            if size == 0 and not chunk.startswith(XLSX_MAGIC):
+                raise WorkbookRejected("response is not an .xlsx workbook")
+            size += len(chunk)
+            if size > max_bytes:
+                raise WorkbookRejected(f"workbook exceeds {max_bytes:,} bytes")
+            digest.update(chunk)
+            spool.write(chunk)
+        if size < MIN_WORKBOOK_BYTES:
+            raise WorkbookRejected("response too small to be a workbook")
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+
+def fetch_workbook(url, headers, parse, timeout=FETCH_TIMEOUT_SECONDS, cancel=None):
+    """GET a workbook and parse it, reusing the cached frame on 304 Not Modified
+
+    The body is streamed through ``stream_workbook``; ``parse`` is then called
+    with the seekable workbook file and its SHA-256 hex digest and returns a
+    DataFrame. Returns the DataFrame, or None when the response is not a
+    usable workbook or ``cancel`` was set while downloading.
+    """
+    with span("fetch") as fetched:
+        response = transport.session.get(url, headers=conditional_headers(url, headers), timeout=timeout, allow_redirects=True, stream=True)
+        with response:
+            if cancel is not None and cancel.is_set():
+                return None
+
+            if response.status_code == 304:
+                entry = revalidation_cache.get(url)
+                if entry is not None:
+                    # Unchanged on the server: no download, no Excel parse. The copy
+                    # is shallow; Copy-on-Write (see dataset.py) keeps the cached frame intact
+                    return entry["df"].copy(deep=False)
+                return None
+
+            if response.status_code != 200:
+                return None
+
+            try:
+                workbook, sha256 = stream_workbook(response, cancel=cancel)
+            except WorkbookRejected:
+                return None
+            fetched.bytes = workbook.seek(0, os.SEEK_END)
+            workbook.seek(0)
+
+    with workbook:
+        if cancel is not None and cancel.is_set():
+            return None
+        df = parse(workbook, sha256)
+    if df is not None and len(df) > 0:
+        revalidation_cache.store(url, response, df)
+        return df.copy(deep=False)
+    return None
+
+
+def breaker_key(candidate):
+    """Circuit breaker / stats key: strategy name plus host"""
+    return f"{candidate['name']}@{urlparse(candidate['url']).netloc}"
+
+
+def _try_candidate(candidate, parse, timeout, cancel=None):
+    key = breaker_key(candidate)
+    if not transport.breaker.allow(key):
+        return None
+
+    start = time.perf_counter()
+    try:
+        df = fetch_workbook(candidate["url"], candidate["headers"], parse, timeout=timeout, cancel=cancel)
+    except Exception:
+        df = None
+    if df is None and cancel is not None and cancel.is_set():
+        # Lost the race - says nothing about the health of this strategy
+        return None
+    transport.breaker.record(key, df is not None, time.perf_counter() - start)
+    return df
+
+
+def first_workbook(candidates, parse, timeout=FETCH_TIMEOUT_SECONDS):
+    """Try the candidates one after another; return ``(df, message)`` of the first that works"""
+    for candidate in candidates:
+        df = _try_candidate(candidate, parse, timeout)
+        if df is not None:
+            return df, candidate["message"]
+    return None, None
+
+
+def race_workbooks(candidates, parse, timeout=FETCH_TIMEOUT_SECONDS):
+    """Fire all candidates at once; return ``(df, message)`` of the first valid workbook
+
+    Losing downloads are told to stop through a shared cancel event and are
+    never parsed, so the worst case is one timeout instead of one per strategy.
+    """
+    if not candidates:
+        return None, None
+
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="scp-fetch")
+    futures = {
+        executor.submit(_try_candidate, candidate, parse, timeout, cancel): candidate
+        for candidate in candidates
+    }
+    try:
+        for future in as_completed(futures):
+            df = future.result()
+            if df is not None:
+                return df, futures[future]["message"]
+    finally:
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None, None
+
+
+def fetch_from_onedrive(onedrive_url, parse, mode=None):
+    """Fetch and parse the workbook behind a sharing URL using ``mode`` ("race" or "sequential")"""
+    candidates = download_candidates(onedrive_url)
+    if (mode or FETCH_MODE) == "sequential":
+        return first_workbook(candidates, parse)
+    return race_workbooks(candidates, parse)
@@ -0,0 +1,140 @@
+# refresher.py - Stale-while-revalidate background refresh of the savings dataset
+
+import os
+import threading
+import time
+
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("SCP_REFRESH_INTERVAL", "300"))
+
+
+class BackgroundRefresher:
+    """Keep a process-wide current dataset and re-poll its source in a daemon thread
+
+    ``load`` returns ``(df, message, is_fallback)`` like ``load_data_from_onedrive``.
+    Readers always get the last good snapshot straight away; only the very
+    first read of a fresh process waits for a load. A fallback load never
+    replaces data that came from the primary source. Polling continues every
+    ``interval`` while any data is held, so a process that started on the
+    fallback switches to the primary source once it answers; a source that
+    never produced data (a mistyped URL) is not polled, and only
+    ``refresh_now`` retries it. ``stop`` ends the thread for good.
+    """
+
+    def __init__(self, load, interval=REFRESH_INTERVAL_SECONDS):
+        self._load = load
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._first_load = threading.Event()
+        self._thread = None
+
+        self.df = None
+        self.message = None
+        self.is_fallback = True
+        self.loaded_at = None
+        self.refreshing = False
+        self.last_attempt_at = None
+        self.last_error = None
+
+    def start(self):
+        """Start the polling thread if it is not running yet (and the refresher was not stopped)"""
+        with self._lock:
+            if self._stop.is_set():
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="scp-refresher", daemon=True)
+                self._thread.start()
+
+    def refresh_now(self):
+        """Ask the polling thread for an immediate refresh without waiting for it"""
+        # Set first: a thread started here clears it and refreshes once
+        self._wake.set()
+        self.start()
+
+    def current(self, timeout=None):
+        """Return ``(df, message, is_fallback)`` of the current snapshot
+
+        Blocks only until the first load of the process has finished.
+        """
+        if not self._first_load.is_set():
+            self.start()
+        self._first_load.wait(timeout)
+        with self._lock:
+            return self.df, self.message, self.is_fallback
+
+    def age_seconds(self):
+        with self._lock:
+            if self.loaded_at is None:
+                return None
+            return time.time() - self.loaded_at
+
+    def status(self):
+        """Short human-readable refresh status for the sidebar"""
+        with self._lock:
+            if self.refreshing:
+                return "Refreshing…"
+            if self.df is not None and self.is_fallback:
+                return f"Serving fallback data, retrying every {format_age(self.interval)}"
+            if self.last_error:
+                return f"Last refresh failed: {self.last_error}"
+            if self.loaded_at is None:
+                return "Waiting for first load"
+            return "Up to date"
+
+    def stop(self):
+        """Stop polling; the current snapshot stays readable"""
+        self._stop.set()
+        self._wake.set()
+        self._first_load.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._refresh()
+            with self._lock:
+                # A source that never produced data (a mistyped URL) is not polled;
+                # a refresh_now that arrived meanwhile still gets its retry
+                if self.df is None and not self._wake.is_set():
+                    self._thread = None
+                    return
+            self._wake.wait(self.interval)
+
+    def _refresh(self):
+        with self._lock:
+            self.refreshing = True
+            self.last_attempt_at = time.time()
+        try:
+            df, message, is_fallback = self._load()
+            error = None
+        except Exception as e:
+            df, message, is_fallback, error = None, None, True, str(e)
+
+        with self._lock:
+            self.refreshing = False
+            if df is None and self.df is None:
+                # Nothing good yet - surface the failure message as-is
+                self.message = message or error
+                self.last_error = error or message
+            elif df is None or (self.df is not None and not self.is_fallback and is_fallback):
+                # Keep serving the last good snapshot
+                self.last_error = error or message or "no data returned"
+            else:
+                self.df = df
+                self.message = message
+                self.is_fallback = is_fallback
+                self.loaded_at = time.time()
+                self.last_error = message if is_fallback else None
+        self._first_load.set()
+
+
+def format_age(seconds):
+    """Render a snapshot age like ``45s``, ``3m 12s`` or ``2h 05m``"""
+    if seconds is None:
+        return "n/a"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {(seconds % 3600) // 60:02d}m"
@@ -0,0 +1,121 @@
+# snapshot_cache.py - On-disk Parquet snapshots of parsed savings workbooks
+
+import hashlib
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from timing import span
+
+SNAPSHOT_DIR = os.environ.get(
+    "SCP_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshot_cache"),
+)
+SNAPSHOT_MAX_BYTES = int(float(os.environ.get("SCP_SNAPSHOT_MAX_MB", "512")) * 1024 * 1024)
+
+
+def content_hash(content):
+    """SHA-256 of the raw workbook bytes or binary file, used as the snapshot key"""
+    if isinstance(content, (bytes, bytearray)):
+        return hashlib.sha256(content).hexdigest()
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in iter(lambda: content.read(1024 * 1024), b""):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Parquet files named by workbook hash, evicted least-recently-used by total size
+
+    A hit skips the Excel parse and preprocessing entirely, so a process
+    restart reloads an unchanged workbook from a Parquet read.
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR, max_bytes=SNAPSHOT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def load(self, key):
+        """Return the snapshot for ``key`` or None"""
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            return None
+        try:
+            # Bump mtime so eviction sees this snapshot as recently used
+            os.utime(path, None)
+        except OSError:
+            pass
+        return df
+
+    def save(self, key, df):
+        """Write ``df`` under ``key``; failures leave the cache untouched"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(fd)
+            try:
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, self._path(key))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except Exception:
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop least-recently-used snapshots until the directory fits ``max_bytes``"""
+        with self._lock:
+            try:
+                entries = []
+                for name in os.listdir(self.directory):
+                    if not name.endswith(".parquet"):
+                        continue
+                    path = os.path.join(self.directory, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                return
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+snapshot_cache = SnapshotCache()
+
+
+def load_or_parse(content, parse, key=None):
+    """Return the snapshot for ``content`` if present, else ``parse`` it and snapshot the result
+
+    ``content`` is workbook bytes or a seekable binary file; pass ``key``
+    when the hash is already known (e.g. computed while streaming).
+    """
+    if key is None:
+        key = content_hash(content)
+    with span("snapshot load") as loaded:
+        df = snapshot_cache.load(key)
+        loaded.rows = len(df) if df is not None else None
+    if df is not None:
+        return df
+    df = parse(content)
+    if df is not None and len(df) > 0:
+        snapshot_cache.save(key, df)
+    return df
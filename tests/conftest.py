@@ -0,0 +1,16 @@
+# conftest.py - Put the app modules and the benchmark helpers on the import path
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+
+@pytest.fixture(scope="session")
+def dummy_workbook():
+    return os.path.join(ROOT, "SCP_Savings_FY26_dummy_v3.xlsx")
@@ -0,0 +1,59 @@
+# test_engines.py - Every optional query engine answers like the pandas index on the dummy workbook
+
+import importlib.util
+
+import pytest
+
+from analytics import FilterSpec, query, result_cache
+from bench_engines import mismatches, selections
+from dataset import build_dataset
+from engines import QUERY_ENGINES
+from workbook import read_savings_workbook
+
+ENGINE_MODULES = {name: module for name, module, _ in QUERY_ENGINES}
+
+
+@pytest.fixture(scope="module")
+def raw(dummy_workbook):
+    return read_savings_workbook(dummy_workbook)
+
+
+@pytest.fixture(scope="module")
+def reference(raw):
+    return build_dataset(raw, engine="pandas")
+
+
+def _answer(dataset, spec):
+    result_cache.clear()
+    return query(dataset, spec)
+
+
+def _specs(dataset):
+    """The benchmark selections plus every Finance FY and Domain pair"""
+    window = dataset.default_window()
+    specs = selections(dataset)
+    for year in dataset.options.get("FY of Savings-Finance", []):
+        for domain in dataset.options.get("Domain", []):
+            specs.append(FilterSpec(window[0], window[1], year, None, domain))
+    return specs
+
+
+def test_selections_cover_every_value(reference):
+    specs = _specs(reference)
+    for field, column in (("finance_fy", "FY of Savings-Finance"), ("domain", "Domain")):
+        chosen = {getattr(spec, field) for spec in specs}
+        assert set(reference.options[column]) <= chosen
+    assert any(spec.start_date != reference.default_window()[0] for spec in specs)
+
+
+@pytest.mark.parametrize("engine", list(ENGINE_MODULES))
+def test_engine_matches_pandas(engine, raw, reference):
+    if importlib.util.find_spec(ENGINE_MODULES[engine]) is None:
+        pytest.skip(f"{ENGINE_MODULES[engine]} is not installed")
+    dataset = build_dataset(raw, engine=engine)
+    assert dataset.engine is not None and dataset.engine.name == engine
+
+    failures = []
+    for spec in _specs(reference):
+        failures += [f"{spec}: {problem}" for problem in mismatches(_answer(reference, spec), _answer(dataset, spec))]
+    assert not failures, "\n".join(failures[:20])
@@ -0,0 +1,93 @@
+# test_onedrive.py - Raced and sequential download strategies against the local OneDrive stub
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import onedrive
+import transport
+from stub_onedrive import StubOneDrive
+
+STALL_SECONDS = 2.0
+TIMEOUT_SECONDS = 10
+
+
+def parse(workbook, sha256):
+    return pd.read_excel(workbook, sheet_name="Savings_WIP_Data")
+
+
+def candidates_for(stub):
+    return [
+        {"name": name, "url": stub.url(f"/{name}"), "headers": {}, "message": name}
+        for name in ("api", "direct", "cleaned")
+    ]
+
+
+def breaker_stats(stub, name):
+    """The breaker's counters for one strategy of ``stub``"""
+    key = onedrive.breaker_key({"name": name, "url": stub.url("/")})
+    return next(row for row in transport.breaker.snapshot() if row["Strategy"] == key)
+
+
+def wait_for_fetch_threads(timeout=STALL_SECONDS + 5):
+    """Let the race's losing downloads run to completion"""
+    deadline = time.monotonic() + timeout
+    while any(thread.name.startswith("scp-fetch") for thread in threading.enumerate()):
+        assert time.monotonic() < deadline, "losing downloads did not finish"
+        time.sleep(0.05)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    onedrive.revalidation_cache.clear()
+    monkeypatch.setattr(transport, "breaker", transport.CircuitBreaker())
+    yield
+    wait_for_fetch_threads()
+
+
+@pytest.fixture
+def stub(request, dummy_workbook):
+    with StubOneDrive(request.param, workbook_path=dummy_workbook, stall_seconds=STALL_SECONDS) as server:
+        yield server
+
+
+@pytest.mark.parametrize("stub", [{"/api": "stall", "/direct": "html", "/cleaned": "ok"}], indirect=True)
+def test_race_returns_first_valid_workbook_before_the_stall(stub):
+    start = time.perf_counter()
+    df, winner = onedrive.race_workbooks(candidates_for(stub), parse, timeout=TIMEOUT_SECONDS)
+    elapsed = time.perf_counter() - start
+
+    assert winner == "cleaned"
+    assert len(df) > 0
+    assert elapsed < STALL_SECONDS
+
+
+@pytest.mark.parametrize("stub", [{"/api": "stall", "/direct": "ok", "/cleaned": "stall"}], indirect=True)
+def test_race_losers_are_not_breaker_failures(stub):
+    df, winner = onedrive.race_workbooks(candidates_for(stub), parse, timeout=TIMEOUT_SECONDS)
+    wait_for_fetch_threads()
+
+    assert winner == "direct"
+    assert breaker_stats(stub, "direct")["Successes"] == 1
+    for loser in ("api", "cleaned"):
+        stats = breaker_stats(stub, loser)
+        assert (stats["Attempts"], stats["Failures"]) == (0, 0)
+
+
+@pytest.mark.parametrize("stub", [{"/api": "fail", "/direct": "html", "/cleaned": "ok"}], indirect=True)
+def test_sequential_falls_through_to_the_working_strategy(stub):
+    df, winner = onedrive.first_workbook(candidates_for(stub), parse, timeout=TIMEOUT_SECONDS)
+
+    assert winner == "cleaned"
+    assert len(df) > 0
+    for failed in ("api", "direct"):
+        assert breaker_stats(stub, failed)["Failures"] == 1
+    assert breaker_stats(stub, "cleaned")["Successes"] == 1
+
+
+@pytest.mark.parametrize("stub", [{"/api": "fail", "/direct": "html", "/cleaned": "fail"}], indirect=True)
+@pytest.mark.parametrize("fetch", [onedrive.first_workbook, onedrive.race_workbooks])
+def test_no_valid_workbook_returns_nothing(stub, fetch):
+    assert fetch(candidates_for(stub), parse, timeout=TIMEOUT_SECONDS) == (None, None)
@@ -0,0 +1,90 @@
+# test_refresher.py - Background refresher polling, fallback and stop behaviour
+
+import time
+
+import pytest
+
+from refresher import BackgroundRefresher
+
+INTERVAL = 0.05
+
+
+class ScriptedLoad:
+    """A ``load`` callable answering from a list of results, repeating the last one"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        result = self.results[min(self.calls, len(self.results) - 1)]
+        self.calls += 1
+        return result
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def refresher_for():
+    refreshers = []
+
+    def build(load):
+        refresher = BackgroundRefresher(load, interval=INTERVAL)
+        refreshers.append(refresher)
+        return refresher
+
+    yield build
+    for refresher in refreshers:
+        refresher.stop()
+
+
+def test_fallback_first_then_remote(refresher_for):
+    load = ScriptedLoad(("local", "Using local file", True), ("remote", "Loaded from OneDrive", False))
+    refresher = refresher_for(load)
+
+    assert refresher.current(timeout=2) == ("local", "Using local file", True)
+    assert refresher.status().startswith("Serving fallback data")
+
+    wait_until(lambda: refresher.current()[2] is False)
+    assert refresher.current() == ("remote", "Loaded from OneDrive", False)
+    assert refresher.status() == "Up to date"
+
+
+def test_fallback_never_replaces_remote_data(refresher_for):
+    load = ScriptedLoad(("remote", "Loaded from OneDrive", False), ("local", "Using local file", True))
+    refresher = refresher_for(load)
+
+    refresher.current(timeout=2)
+    wait_until(lambda: load.calls >= 3)
+    assert refresher.current() == ("remote", "Loaded from OneDrive", False)
+    assert refresher.status() == "Last refresh failed: Using local file"
+
+
+def test_source_without_data_is_not_polled(refresher_for):
+    load = ScriptedLoad((None, "No such file", True))
+    refresher = refresher_for(load)
+
+    assert refresher.current(timeout=2) == (None, "No such file", True)
+    time.sleep(INTERVAL * 5)
+    assert load.calls == 1
+
+    refresher.refresh_now()
+    wait_until(lambda: load.calls == 2)
+
+
+def test_stop_ends_polling(refresher_for):
+    load = ScriptedLoad(("remote", "Loaded from OneDrive", False))
+    refresher = refresher_for(load)
+
+    refresher.current(timeout=2)
+    refresher.stop()
+    time.sleep(INTERVAL * 2)
+    calls = load.calls
+    time.sleep(INTERVAL * 5)
+    assert load.calls == calls
+    assert refresher.current() == ("remote", "Loaded from OneDrive", False)
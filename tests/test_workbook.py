@@ -0,0 +1,64 @@
+# test_workbook.py - Every reader engine types blank and text cells the same way
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from workbook import SHEET_NAME, available_engines, read_savings_workbook
+
+# (header as written in the sheet, data row) -> cell value; row 2 is the first data row
+EDITS = {
+    ("Difference ", 2): None,
+    ("Difference ", 3): "n/a",
+    ("Total Contract Amount", 4): None,
+    ("Total Contract Amount", 5): "tbd",
+    ("Forecast (PA)", 6): "$1,200.50",
+    ("Support Duration", 7): None,
+    ("Support Duration", 8): "12 months",
+    ("Difference (PA)-Finance", 9): None,
+    ("Difference (PA)-Finance", 10): "n/a",
+    ("Brand ", 11): None,
+    ("Brand ", 12): 42,
+    ("Contract Start", 13): None,
+    ("Contract End", 14): "2027-03-31",
+}
+
+
+@pytest.fixture(scope="module")
+def messy_workbook(dummy_workbook, tmp_path_factory):
+    """The dummy workbook with blank and text cells, trailing-space headers included"""
+    book = openpyxl.load_workbook(dummy_workbook)
+    sheet = book[SHEET_NAME]
+    columns = {str(cell.value): cell.column for cell in sheet[1]}
+    for (header, row), value in EDITS.items():
+        sheet.cell(row=row, column=columns[header]).value = value
+    path = tmp_path_factory.mktemp("workbooks") / "messy.xlsx"
+    book.save(path)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def frames(messy_workbook):
+    return {engine: read_savings_workbook(messy_workbook, engine=engine) for engine in available_engines()}
+
+
+def test_engines_agree(frames):
+    reference_engine, reference = next(iter(frames.items()))
+    for engine, df in frames.items():
+        try:
+            pd.testing.assert_frame_equal(df, reference)
+        except AssertionError as e:
+            pytest.fail(f"{engine} differs from {reference_engine}: {e}")
+
+
+def test_blank_and_text_cells(frames):
+    for df in frames.values():
+        assert df["Difference"].iloc[:2].isna().all()
+        assert df["Total Contract Amount"].iloc[2:4].isna().all()
+        assert df["Forecast (PA)"].iloc[4] == 1200.50
+        assert df["Support Duration"].iloc[5:7].isna().all()
+        assert (df["Savings_Finance"].iloc[7:9] == 0.0).all()
+        assert pd.isna(df["Brand"].iloc[9])
+        assert df["Brand"].iloc[10] == "42"
+        assert pd.isna(df["Contract Start"].iloc[11])
+        assert df["Contract End"].iloc[12] == pd.Timestamp("2027-03-31")
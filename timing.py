@@ -0,0 +1,140 @@
+# timing.py - Lightweight per-stage timing spans for the sidebar performance panel
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Spans kept per stage for the rolling percentiles
+TIMING_HISTORY = int(os.environ.get("SCP_TIMING_HISTORY", "200"))
+
+
+class Span:
+    """One timed stage: wall time plus the rows and bytes it handled, when known"""
+
+    __slots__ = ("stage", "seconds", "rows", "bytes")
+
+    def __init__(self, stage, rows=None, nbytes=None):
+        self.stage = stage
+        self.seconds = 0.0
+        self.rows = rows
+        self.bytes = nbytes
+
+
+class StageStats:
+    """Process-wide rolling window of span durations per stage
+
+    Collects spans from every thread, including the background refresher
+    and deferred downloads, which have no rerun to attach them to.
+    """
+
+    def __init__(self, history=TIMING_HISTORY):
+        self.history = history
+        self._stages = OrderedDict()
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            if span.stage not in self._stages:
+                self._stages[span.stage] = deque(maxlen=self.history)
+            self._stages[span.stage].append(span.seconds)
+            self._last[span.stage] = span
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+            self._last.clear()
+
+    def snapshot(self):
+        """Per-stage last / p50 / p95 in milliseconds, ready for ``st.dataframe``"""
+        rows = []
+        with self._lock:
+            for stage, durations in self._stages.items():
+                p50, p95 = np.percentile(np.fromiter(durations, float, len(durations)), [50, 95]) * 1000
+                last = self._last[stage]
+                rows.append({
+                    "Stage": stage,
+                    "Runs": len(durations),
+                    "Last (ms)": round(last.seconds * 1000, 1),
+                    "p50 (ms)": round(p50, 1),
+                    "p95 (ms)": round(p95, 1),
+                    "Rows": last.rows,
+                    "Bytes": last.bytes,
+                })
+        return rows
+
+
+stage_stats = StageStats()
+
+_local = threading.local()
+
+
+class Trace:
+    """The spans of one script or fragment run, in the order they finished"""
+
+    def __init__(self):
+        self.spans = []
+        self.started = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def table(self):
+        """The spans as a list of dicts, ready for ``st.dataframe``"""
+        return [
+            {"Stage": span.stage, "ms": round(span.seconds * 1000, 1), "Rows": span.rows, "Bytes": span.bytes}
+            for span in self.spans
+        ]
+
+
+def start_trace():
+    """Collect this thread's spans into a new ``Trace`` until ``finish_trace``"""
+    _local.trace = Trace()
+    return _local.trace
+
+
+def finish_trace():
+    _local.trace = None
+
+
+def current_trace():
+    """The thread's open trace, or None"""
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def section_trace():
+    """Yield the thread's open trace, or a new one closed when the block ends"""
+    trace = current_trace()
+    if trace is not None:
+        yield trace
+        return
+    trace = start_trace()
+    try:
+        yield trace
+    finally:
+        finish_trace()
+
+
+@contextmanager
+def span(stage, rows=None, nbytes=None):
+    """Time the ``with`` block as ``stage``
+
+    The yielded ``Span`` can be given ``rows`` / ``bytes`` inside the
+    block once they are known. The span goes to the process-wide stats
+    and, when this thread has an open trace, to that trace.
+    """
+    current = Span(stage, rows, nbytes)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - started
+        stage_stats.record(current)
+        trace = current_trace()
+        if trace is not None:
+            trace.spans.append(current)
@@ -0,0 +1,122 @@
+# transport.py - Shared HTTP session, circuit breaker and per-strategy stats for workbook fetches
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("SCP_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get("SCP_BREAKER_COOLDOWN_MINUTES", "5")) * 60
+
+
+def build_session(pool_size=8, retries=2, backoff_factor=0.5):
+    """A keep-alive ``requests.Session`` with pooled connections and bounded retry
+
+    Connection errors and 429/5xx answers are retried with exponential
+    backoff. Read timeouts are not, so one stalled strategy costs at most
+    one timeout.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = build_session()
+
+
+class CircuitBreaker:
+    """Skip a strategy for ``cooldown`` seconds after ``threshold`` consecutive failures
+
+    Also keeps attempt / success / failure / skip counters and latencies per
+    strategy for the sidebar diagnostics.
+    """
+
+    def __init__(self, threshold=BREAKER_FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _entry(self, key):
+        if key not in self._stats:
+            self._stats[key] = {
+                "attempts": 0,
+                "successes": 0,
+                "failures": 0,
+                "skipped": 0,
+                "consecutive_failures": 0,
+                "open_until": 0.0,
+                "total_latency": 0.0,
+                "last_latency": None,
+            }
+        return self._stats[key]
+
+    def allow(self, key):
+        """True when ``key`` may be tried now; counts a skip otherwise"""
+        with self._lock:
+            entry = self._entry(key)
+            if entry["open_until"] > time.time():
+                entry["skipped"] += 1
+                return False
+            return True
+
+    def record(self, key, ok, latency):
+        with self._lock:
+            entry = self._entry(key)
+            entry["attempts"] += 1
+            entry["total_latency"] += latency
+            entry["last_latency"] = latency
+            if ok:
+                entry["successes"] += 1
+                entry["consecutive_failures"] = 0
+                entry["open_until"] = 0.0
+            else:
+                entry["failures"] += 1
+                entry["consecutive_failures"] += 1
+                if entry["consecutive_failures"] >= self.threshold:
+                    entry["open_until"] = time.time() + self.cooldown
+
+    def reset(self, key=None):
+        """Close the breaker for ``key`` (or every strategy) straight away"""
+        with self._lock:
+            for name, entry in self._stats.items():
+                if key is None or name == key:
+                    entry["consecutive_failures"] = 0
+                    entry["open_until"] = 0.0
+
+    def snapshot(self):
+        """Per-strategy counters as a list of dicts, ready for ``st.dataframe``"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for key, entry in sorted(self._stats.items()):
+                attempts = entry["attempts"]
+                rows.append({
+                    "Strategy": key,
+                    "Attempts": attempts,
+                    "Successes": entry["successes"],
+                    "Failures": entry["failures"],
+                    "Skipped": entry["skipped"],
+                    "Avg latency (s)": round(entry["total_latency"] / attempts, 2) if attempts else None,
+                    "Last latency (s)": round(entry["last_latency"], 2) if entry["last_latency"] is not None else None,
+                    "Circuit": "open" if entry["open_until"] > now else "closed",
+                })
+        return rows
+
+
+breaker = CircuitBreaker()
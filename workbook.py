@@ -0,0 +1,255 @@
+# workbook.py - Savings workbook ingestion schema and parsing
+
+import datetime
+import importlib.util
+import numbers
+import os
+
+import numpy as np
+import pandas as pd
+
+from timing import span
+
+SHEET_NAME = "Savings_WIP_Data"
+
+# "auto" picks the fastest installed engine; any name from READER_ENGINES forces one
+XLSX_ENGINE = os.environ.get("SCP_XLSX_ENGINE", "auto")
+
+# Bump when the schema or preprocessing changes so old Parquet snapshots are not reused
+SCHEMA_VERSION = "4"
+
+# Columns read from Savings_WIP_Data, in sheet order, and how each one is typed
+# on the way in. "dimension" columns are text, "date" columns are parsed during
+# the read, "amount" columns are coerced to float with blanks/text as NaN,
+# "measure" columns (the two savings figures every KPI sums) the same but with
+# blanks/text as 0, and "count" columns (month counts) are nullable integers. Everything the
+# Portfolio export shows is kept; only the spreadsheet working columns
+# (Calculation2, Monthly, Column1) are never materialised.
+INGEST_SCHEMA = {
+    "Domain": "dimension",
+    "Forecast ID": "dimension",
+    "Brand": "dimension",
+    "Vendor": "dimension",
+    "Term Description": "dimension",
+    "Contract Start": "date",
+    "Contract End": "date",
+    "Support Duration": "count",
+    "Requestor": "dimension",
+    "Secondary Requestor": "dimension",
+    "Month for Savings": "count",
+    "Month for Savings(Finance)": "count",
+    "Remaining Months": "count",
+    "Month-SCP": "dimension",
+    "FY of Savings-SCP": "dimension",
+    "Month of Savings-Finance": "dimension",
+    "FY of Savings-Finance": "dimension",
+    "Total Contract Amount": "amount",
+    "Total Contract Forecast": "amount",
+    "Contract Amount (PA)": "amount",
+    "Forecast (PA)": "amount",
+    "Difference": "amount",
+    "Difference (PA)-Finance": "measure",
+    "Difference (PA) -SCP": "measure",
+    "%": "amount",
+}
+
+RENAMED_COLUMNS = {
+    "Difference (PA)-Finance": "Savings_Finance",
+    "Difference (PA) -SCP": "Savings_SCP",
+}
+
+DATE_COLUMNS = ["Contract Start", "Contract End"]
+
+
+def _to_amount(value):
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").replace("$", ""))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_measure(value):
+    amount = _to_amount(value)
+    return amount if amount == amount else 0.0
+
+
+def _to_count(value):
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return None
+    amount = _to_amount(value)
+    return int(amount) if amount.is_integer() else None
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return pd.NaT
+    return pd.to_datetime(value, errors="coerce")
+
+
+def _to_dimension(value):
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+
+CONVERTERS = {
+    "dimension": _to_dimension,
+    "date": _to_date,
+    "amount": _to_amount,
+    "measure": _to_measure,
+    "count": _to_count,
+}
+
+
+def read_kwargs(schema=INGEST_SCHEMA):
+    """``pd.read_excel`` keyword arguments that project the sheet to ``schema`` as raw cells"""
+    return {
+        "sheet_name": SHEET_NAME,
+        # A callable keeps the read working when an optional column is missing,
+        # and tolerates stray spaces in headers (the sheet has "Brand " and "Difference ")
+        "usecols": lambda column: str(column).strip() in schema,
+        # No inference: apply_schema types every column the same way for every engine
+        "dtype": object,
+    }
+
+
+def apply_schema(df, schema=INGEST_SCHEMA):
+    """Type the raw cells of a projected sheet per ``schema``
+
+    Every reader hands over untyped cells under stripped header names, so
+    the converters run on the same values whatever engine read them.
+    """
+    columns = {}
+    for column in df.columns:
+        kind = schema[column]
+        values = [CONVERTERS[kind](value) for value in df[column]]
+        if kind == "date":
+            columns[column] = pd.to_datetime(pd.Series(values, dtype=object), errors="coerce")
+        elif kind == "count":
+            columns[column] = pd.array(values, dtype="Int64")
+        elif kind in ("amount", "measure"):
+            columns[column] = np.array(values, dtype=np.float64)
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, columns=list(df.columns))
+
+
+def _read_with_calamine(source, schema):
+    """Rust-backed reader from python-calamine via pandas"""
+    return pd.read_excel(source, engine="calamine", **read_kwargs(schema))
+
+
+def _read_with_openpyxl_rows(source, schema):
+    """Stream rows from openpyxl in read-only mode, keeping only the projected columns"""
+    import openpyxl
+
+    book = openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = book[SHEET_NAME].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame(columns=list(schema))
+
+        picked = [
+            (index, str(name).strip())
+            for index, name in enumerate(header)
+            if name is not None and str(name).strip() in schema
+        ]
+        columns = {name: [] for _, name in picked}
+        targets = [(index, columns[name]) for index, name in picked]
+        width = len(header)
+
+        for row in rows:
+            if not any(value is not None for value in row):
+                # read_excel drops fully blank rows too
+                continue
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            for index, values in targets:
+                values.append(row[index])
+    finally:
+        book.close()
+    return pd.DataFrame(columns, dtype=object)
+
+
+def _read_with_openpyxl(source, schema):
+    """The plain pandas openpyxl path"""
+    return pd.read_excel(source, **read_kwargs(schema))
+
+
+# Fastest first; each entry is (name, required module, reader)
+READER_ENGINES = [
+    ("calamine", "python_calamine", _read_with_calamine),
+    ("openpyxl-rows", "openpyxl", _read_with_openpyxl_rows),
+    ("openpyxl", "openpyxl", _read_with_openpyxl),
+]
+
+
+def available_engines():
+    """Names of the reader engines whose dependency is installed, fastest first"""
+    return [name for name, module, _ in READER_ENGINES if importlib.util.find_spec(module) is not None]
+
+
+def read_sheet(source, engine=None, schema=INGEST_SCHEMA):
+    """Read Savings_WIP_Data with ``engine``, or the fastest engine that works
+
+    ``source`` is a path or seekable binary file. With ``engine="auto"`` an
+    engine that fails (missing dependency, unsupported file) falls through
+    to the next one. Returns ``(df, engine_name)``.
+    """
+    engine = engine or XLSX_ENGINE
+    if engine == "auto":
+        candidates = available_engines()
+    else:
+        candidates = [engine]
+
+    readers = {name: reader for name, _, reader in READER_ENGINES}
+    error = None
+    for name in candidates:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        try:
+            df = readers[name](source, schema)
+        except Exception as e:
+            if engine != "auto":
+                raise
+            error = e
+            continue
+        df.columns = [str(column).strip() for column in df.columns]
+        return apply_schema(df, schema), name
+    raise error or ValueError("no Excel reader engine available")
+
+
+def preprocess_savings_data(df):
+    """Normalise column names, amounts and contract dates of the raw sheet
+
+    Columns already typed by the ingestion schema are left as they are; the
+    coercions only run for frames read without it.
+    """
+    df = df.rename(columns=RENAMED_COLUMNS)
+
+    # Ensure numeric columns
+    for col in ["Savings_Finance", "Savings_SCP"]:
+        if not pd.api.types.is_float_dtype(df[col]) or df[col].hasnans:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    # Convert date columns
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def read_savings_workbook(source, engine=None):
+    """Parse and preprocess the Savings_WIP_Data sheet from a path or binary file"""
+    with span("parse") as parsed:
+        df, _ = read_sheet(source, engine=engine)
+        parsed.rows = len(df)
+    with span("preprocess", rows=len(df)):
+        return preprocess_savings_data(df)